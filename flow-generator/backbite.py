@@ -0,0 +1,460 @@
+from collections import deque
+
+"""
+functions for generating flows from a random Hamiltonian path over the whole grid, for boards too
+large for the path search (see generator.generateFlows()); the path is cut into flows, and flows
+whose ends meet are then merged where they stay legal, so the cost of a board is close to linear
+in its number of cells
+
+a space-filling path keeps running alongside itself, so the flows cut from it are short (7 to 8
+cells on average after merging, on a 30x30 board, against about 12 for the path search and 21 for
+the walk engine), and puzzles from this engine have many more flows than the others'
+
+"""
+
+# shortest legal flow, in cells
+MIN_LENGTH = 3
+
+# number of backbite moves made on the Hamiltonian path, per row and column of the grid, and the
+# most cells the moves may reverse in total, per cell of the grid (each move reverses part of the
+# path, on average a large fraction of it, so without a bound the moves cost more per cell the
+# larger the grid)
+MOVES_PER_LINE = 4
+REVERSED_PER_CELL = 32
+
+# number of times a Hamiltonian path may be cut into flows before the run gives up (see placeBackbiteFlows())
+CUT_ATTEMPTS = 4
+
+def getSpanningTree(block_rows, block_cols, rng):
+    """
+    build a uniformly shuffled spanning tree over a grid of blocks (randomized Kruskal)
+
+    @param  block_rows  :   number of rows of blocks
+    @param  block_cols  :   number of columns of blocks
+    @param  rng         :   random.Random instance to draw the tree from
+
+    @return             :   list of the tree's edges, as pairs of block indices (col * block_rows + row)
+    """
+
+    edges = []
+    for col in range(block_cols):
+        for row in range(block_rows):
+            block = col * block_rows + row
+
+            if row + 1 < block_rows:
+                edges.append((block, block + 1))
+            if col + 1 < block_cols:
+                edges.append((block, block + block_rows))
+
+    rng.shuffle(edges)
+
+    # union-find with path halving
+    roots = list(range(block_rows * block_cols))
+
+    def find(block):
+        while not roots[block] == block:
+            roots[block] = roots[roots[block]]
+            block = roots[block]
+
+        return block
+
+    tree = []
+    for a, b in edges:
+        root_a, root_b = find(a), find(b)
+
+        if not root_a == root_b:
+            roots[root_a] = root_b
+            tree.append((a, b))
+
+    return tree
+
+def getHamiltonianPath(grid, rng):
+    """
+    build a random Hamiltonian path over every cell of the grid, working on flat cell indices (see
+    Grid); the even part of the grid is covered by the cycle running around a random spanning tree
+    of its 2x2 blocks, which detours through the leftover column and row of odd-sized grids
+
+    @param  grid    :   grid to cover
+    @param  rng     :   random.Random instance to draw the path from
+
+    @return         :   list of every cell index of the grid, in path order
+    """
+
+    rows, cols = grid.rows, grid.cols
+
+    # grids one cell wide are covered by a single line
+    if rows == 1 or cols == 1:
+        return list(range(grid.size))
+
+    # each cell of the cycle is linked to the two cells before and after it
+    links = [ set() for cell in range(grid.size) ]
+
+    def link(a, b):
+        links[a].add(b)
+        links[b].add(a)
+
+    def unlink(a, b):
+        links[a].discard(b)
+        links[b].discard(a)
+
+    block_rows, block_cols = rows // 2, cols // 2
+
+    # start with a cycle around every 2x2 block...
+    for block_col in range(block_cols):
+        for block_row in range(block_rows):
+            corner = 2 * block_col * rows + 2 * block_row
+
+            link(corner, corner + 1)
+            link(corner + 1, corner + rows + 1)
+            link(corner + rows + 1, corner + rows)
+            link(corner + rows, corner)
+
+    # ...and join the cycles of blocks connected by the tree into a single cycle
+    for a, b in getSpanningTree(block_rows, block_cols, rng):
+        corner_a = 2 * (a // block_rows) * rows + 2 * (a % block_rows)
+        corner_b = 2 * (b // block_rows) * rows + 2 * (b % block_rows)
+
+        # b is right of a
+        if b == a + block_rows:
+            unlink(corner_a + rows, corner_a + rows + 1)
+            unlink(corner_b, corner_b + 1)
+            link(corner_a + rows, corner_b)
+            link(corner_a + rows + 1, corner_b + 1)
+
+        # b is above a
+        else:
+            unlink(corner_a + 1, corner_a + rows + 1)
+            unlink(corner_b, corner_b + rows)
+            link(corner_a + 1, corner_b)
+            link(corner_a + rows + 1, corner_b + rows)
+
+    # blocks along the right and top edges are never joined across their outer sides, so the cycle
+    # runs along those sides; detour it through the leftover column and row, two cells at a time
+    if cols % 2 == 1:
+        edge = (cols - 2) * rows
+        for row in range(0, rows - 1, 2):
+            unlink(edge + row, edge + row + 1)
+            link(edge + row, edge + rows + row)
+            link(edge + rows + row, edge + rows + row + 1)
+            link(edge + rows + row + 1, edge + row + 1)
+
+    if rows % 2 == 1:
+        for col in range(0, cols - 1, 2):
+            edge = col * rows + rows - 2
+            unlink(edge, edge + rows)
+            link(edge, edge + 1)
+            link(edge + 1, edge + rows + 1)
+            link(edge + rows + 1, edge + rows)
+
+    # the cycle covers every cell except the top right corner of a grid with an odd number of rows
+    # and of columns; the path is cut from the cycle so that it ends next to that corner
+    corner = grid.size - 1
+
+    if len(links[corner]) == 0:
+        end = grid.neighbors[corner][rng.randrange(len(grid.neighbors[corner]))]
+    else:
+        end = rng.randrange(grid.size)
+
+    start = next(iter(links[end]))
+
+    path, previous, cell = [ end ], end, start
+    while not cell == end:
+        path.append(cell)
+        previous, cell = cell, next(other for other in links[cell] if not other == previous)
+
+    path.reverse()
+
+    if len(links[corner]) == 0:
+        path.append(corner)
+
+    return path
+
+def backbite(grid, path, moves, rng, max_reversed=None):
+    """
+    randomize a Hamiltonian path in place with backbite moves: an end of the path is joined to one
+    of its other neighbors, and the edge that would close the cycle is removed, reversing the part
+    of the path between them
+
+    the position of each cell in the path is kept in a table, so a move costs the length of the part
+    it reverses; that's on average a large fraction of the path, which is what max_reversed bounds
+
+    @param      grid            :   grid the path covers
+    @param      path            :   list of cell indices of the path
+    @param      moves           :   number of moves to make
+    @param      rng             :   random.Random instance to draw the moves from
+    @optional   max_reversed    :   number of cells reversed after which no more moves are made
+                                    (no limit if None)
+    """
+
+    # paths of fewer than 3 cells can't change
+    if len(path) < 3:
+        return
+
+    neighbors, length = grid.neighbors, len(path)
+
+    # position of each cell in the path (None for cells it doesn't cover)
+    positions = [ None ] * grid.size
+    for position, cell in enumerate(path):
+        positions[cell] = position
+
+    reversed_cells = 0
+
+    for move in range(moves):
+        if not max_reversed is None and reversed_cells >= max_reversed:
+            break
+
+        # bite with the last cell...
+        if rng.random() < 0.5:
+            adjacent = neighbors[path[-1]]
+            position = positions[adjacent[rng.randrange(len(adjacent))]]
+
+            if not position is None and not position == length - 2:
+                path[position + 1:] = path[:position:-1]
+
+                # update the reversed cells' positions (map() keeps the loop out of Python)
+                deque(map(positions.__setitem__, path[position + 1:], range(position + 1, length)), maxlen=0)
+                reversed_cells += length - position - 1
+
+        # ...or the first
+        else:
+            adjacent = neighbors[path[0]]
+            position = positions[adjacent[rng.randrange(len(adjacent))]]
+
+            if not position is None and not position == 1:
+                path[:position] = path[position - 1::-1]
+
+                deque(map(positions.__setitem__, path[:position], range(position)), maxlen=0)
+                reversed_cells += position
+
+def isSelfAvoiding(grid, flow, value):
+    """
+    determine whether a flow placed in the grid never touches itself, i.e. each of its cells is only
+    adjacent to the cells before and after it in the flow
+
+    @param  grid    :   grid the flow is placed in
+    @param  flow    :   list of the flow's cell indices, in order
+    @param  value   :   value the flow's cells are assigned in the grid
+
+    @return         :   True if the flow doesn't touch itself; False otherwise
+    """
+
+    last = len(flow) - 1
+
+    for position, cell in enumerate(flow):
+        # the ends of the flow have one neighbor in it, and every other cell has two
+        allowed = 1 if position == 0 or position == last else 2
+
+        if grid.valueDegreeAt(cell, value) > allowed:
+            return False
+
+    return True
+
+def cutPath(grid, path, rng, max_length=None, stats=None):
+    """
+    cut a path over unoccupied cells into flows of at least MIN_LENGTH cells and place them in the
+    grid, in time linear in its length; flows are cut at random lengths, and also wherever a flow
+    would touch itself (a cell adjacent to a cell of its flow other than the one before it)
+
+    @param      grid        :   grid to place the flows in
+    @param      path        :   list of unoccupied cell indices, in path order
+    @param      rng         :   random.Random instance to draw the flow lengths from
+    @optional   max_length  :   longest flow cut at random (defaults to rows + cols)
+    @optional   stats       :   Stats to report the first cell of each flow to as a source, as it's
+                                placed (the flows themselves are reported once they're final, see
+                                placeBackbiteFlows())
+
+    @return                 :   list of the flows placed in the grid, as lists of cell indices, each
+                                assigned its position in the list (None if the end of the path
+                                couldn't be made into a legal flow; the cells are placed regardless)
+    """
+
+    if max_length is None:
+        max_length = grid.rows + grid.cols
+
+    max_length = max(max_length, MIN_LENGTH)
+
+    flows, flow = [], []
+    target = rng.randint(MIN_LENGTH, max_length)
+
+    for cell in path:
+        # start a new flow once this one is long enough, or if the cell would touch it
+        if len(flow) == target or (len(flow) > 0 and grid.valueDegreeAt(cell, len(flows)) > 1):
+            flows.append(flow)
+            flow = []
+            target = rng.randint(MIN_LENGTH, max_length)
+
+        if len(flow) == 0 and not stats is None:
+            stats.addSource(grid, cell, len(flows))
+
+        grid.setAt(cell, len(flows))
+        flow.append(cell)
+
+    flows.append(flow)
+
+    # only the last flow can be too short (a flow is only cut early when its next cell would touch
+    # it, which takes at least 3 cells, e.g. three cells of a 2x2 square, so every flow but the
+    # last has at least MIN_LENGTH cells)
+    if len(flow) < MIN_LENGTH:
+        if len(flows) == 1:
+            return None
+
+        last, before = flows.pop(), flows.pop()
+        value = len(flows)
+
+        # try adding the short flow's cells to the end of the flow before it...
+        for cell in last:
+            grid.setAt(cell, value)
+
+        if isSelfAvoiding(grid, before + last, value):
+            flows.append(before + last)
+
+            return flows
+
+        # ...otherwise move cells from the end of the flow before it to the start of the short flow
+        for cell in last:
+            grid.setAt(cell, value + 1)
+
+        while len(last) < MIN_LENGTH and len(before) > MIN_LENGTH:
+            cell = before.pop()
+            last.insert(0, cell)
+            grid.setAt(cell, value + 1)
+
+        flows.extend([ before, last ])
+
+        if len(last) < MIN_LENGTH or not isSelfAvoiding(grid, last, value + 1):
+            return None
+
+    return flows
+
+def mergeFlows(grid, flows, rng):
+    """
+    merge flows whose ends are adjacent, working on flat cell indices (see Grid; the backbite
+    engine's repair of the short flows it cuts, and the core of generator.combinePaths())
+
+    pairs of adjacent ends are found once, through an index from each end cell to its flow, and are
+    merged in random order as long as the merged flow doesn't touch itself; the smaller flow of a
+    pair is always merged into the larger one (only its cells are checked and relabelled), so the
+    whole pass takes O(n log n) time for n cells
+
+    @param  grid    :   grid the flows are placed in
+    @param  flows   :   list of the flows, as lists of cell indices, each assigned its position in
+                        the list in the grid
+    @param  rng     :   random.Random instance to draw the merge order from
+
+    @return         :   list of the merged flows, as lists of cell indices; each flow's cells are
+                        assigned its position in the list in the grid
+    """
+
+    neighbors, cellValues = grid.neighbors, grid.cellValues
+
+    # flows are kept as deques of cell indices, so either end can be extended; a merged flow's
+    # entry is set to None
+    flows = [ deque(flow) for flow in flows ]
+
+    # index of each end cell to the flow it belongs to
+    ends = {}
+    for value, flow in enumerate(flows):
+        ends[flow[0]] = value
+        ends[flow[-1]] = value
+
+    # merging only ever removes ends, so every pair of adjacent ends is known up front (each pair
+    # is listed once, from its lower cell)
+    pairs = [   (end, other) for end in ends for other in neighbors[end]
+                if end < other and other in ends and not ends[end] == ends[other]   ]
+
+    rng.shuffle(pairs)
+
+    for end, other in pairs:
+        # both cells have to still be ends, of different flows
+        if not end in ends or not other in ends or ends[end] == ends[other]:
+            continue
+
+        value, other_value = ends[end], ends[other]
+
+        # merge the smaller flow into the larger one
+        if len(flows[value]) < len(flows[other_value]):
+            end, other, value, other_value = other, end, other_value, value
+
+        kept, moved = flows[value], flows[other_value]
+
+        # the merged flow mustn't touch itself: the joined ends have to be the only adjacent cells
+        # of the two flows
+        touching = any( cellValues[neighbor] == value and not (cell == other and neighbor == end)
+                        for cell in moved for neighbor in neighbors[cell]   )
+
+        if touching:
+            continue
+
+        # line the moved flow up so it starts at the joined end
+        if not moved[0] == other:
+            moved.reverse()
+
+        if kept[-1] == end:
+            kept.extend(moved)
+        else:
+            kept.extendleft(moved)
+
+        for cell in moved:
+            grid.setAt(cell, value)
+
+        del ends[end], ends[other]
+        ends[moved[-1]] = value
+
+        flows[other_value] = None
+
+    # number the merged flows in order
+    merged = [ list(flow) for flow in flows if not flow is None ]
+
+    for value, flow in enumerate(merged):
+        for cell in flow:
+            grid.setAt(cell, value)
+
+    return merged
+
+def placeBackbiteFlows(grid, rng, budget, stats=None):
+    """
+    make one run at filling an empty grid with flows cut from a random Hamiltonian path (the
+    counterpart of generator.placeFlows() for the backbite engine)
+
+    @param      grid    :   empty grid the flows will be placed on (a ValueError is raised otherwise)
+    @param      rng     :   random.Random instance to draw random choices from
+    @param      budget  :   Budget bounding the run (the whole board is one step)
+    @optional   stats   :   Stats to record the run in (the first cell of each flow cut from the
+                            path is reported as a source, and each flow left after merging as a
+                            placement)
+
+    @return             :   list of the paths placed in the grid during this run, as lists of cell
+                            indices (the run filled the grid if no unoccupied cells are left)
+    """
+
+    if not grid.emptyCount == grid.size:
+        raise ValueError("The backbite engine only fills empty grids")
+
+    if not budget.spend():
+        return []
+
+    path = getHamiltonianPath(grid, rng)
+    backbite(grid, path, MOVES_PER_LINE * (grid.rows + grid.cols), rng, REVERSED_PER_CELL * grid.size)
+
+    # the end of the path may not make a legal flow with the lengths drawn; cut it again, from
+    # alternating ends, a few times before giving up on the run
+    for attempt in range(CUT_ATTEMPTS):
+        flows = cutPath(grid, path, rng, stats=stats)
+
+        if not flows is None:
+            # the path is cut wherever a flow would touch itself, which leaves many short flows
+            # side by side; join the ones whose ends meet
+            flows = mergeFlows(grid, flows, rng)
+
+            if not stats is None:
+                for index, flow in enumerate(flows):
+                    stats.addPlacement(flow, index, False)
+
+            return flows
+
+        for cell in path:
+            grid.resetAt(cell)
+
+        path.reverse()
+
+    return []
@@ -0,0 +1,92 @@
+"""
+functions for working on sets of grid cells packed into Python integers (bitboards): bit i of a
+board is set if the cell with flat index i (see Grid) is in the set, so a step of a flood fill over
+the whole grid is a handful of shifts, ands and ors (used for the component check on larger grids,
+see generator.getEmptyComponentSizes(); degrees aren't counted this way, since the grid keeps
+them up to date one change at a time)
+
+"""
+
+# cache of (board, not top row, not bottom row) masks for each (rows, cols) shape
+masks = {}
+
+def getMasks(rows, cols):
+    """
+    get the masks of a grid shape, building them only the first time a shape is requested
+
+    @param  rows    :   number of rows in the grid
+    @param  cols    :   number of columns in the grid
+
+    @return         :   3-tuple of the board with every cell set, the board with every cell but
+                        those in the top row set and the board with every cell but those in the
+                        bottom row set
+    """
+
+    shape = (rows, cols)
+
+    if not shape in masks:
+        column = (1 << rows) - 1
+        board = int(("0" * (rows - 1) + "1") * cols, 2) * column
+
+        # every column of each board, one column at a time
+        below_top = int(("0" * (rows - 1) + "1") * cols, 2) * (column >> 1)
+        above_bottom = below_top << 1
+
+        masks[shape] = (board, below_top, above_bottom)
+
+    return masks[shape]
+
+def countCells(bits):
+    """
+    count the cells in a board
+
+    @param  bits    :   board of cells
+
+    @return         :   number of cells set in the board
+    """
+
+    return bin(bits).count("1")
+
+def floodFill(bits, allowed, rows, cols):
+    """
+    grow a board to the whole component of the allowed cells it lies in, one step of whole-board
+    operations per cell of distance (so O(diameter) steps)
+
+    @param  bits    :   board of the cells to start from (must be allowed)
+    @param  allowed :   board of the cells the component may contain
+    @param  rows    :   number of rows in the grid
+    @param  cols    :   number of columns in the grid
+
+    @return         :   board of every allowed cell connected to the starting cells
+    """
+
+    board, below_top, above_bottom = getMasks(rows, cols)
+
+    component, frontier = bits, bits
+    while not frontier == 0:
+        grown = ((frontier & below_top) << 1 | (frontier & above_bottom) >> 1 | frontier << rows | frontier >> rows) & allowed
+
+        # only cells reached for the first time are expanded next
+        frontier = grown & ~component
+        component |= frontier
+
+    return component
+
+def iterComponents(bits, rows, cols):
+    """
+    lazily split a board into its connected components
+
+    @param  bits    :   board of cells
+    @param  rows    :   number of rows in the grid
+    @param  cols    :   number of columns in the grid
+
+    @return         :   generator of the boards of each component, in order of their lowest cell
+    """
+
+    while not bits == 0:
+        # start from the lowest cell left
+        component = floodFill(bits & -bits, bits, rows, cols)
+
+        yield component
+
+        bits &= ~component
@@ -0,0 +1,127 @@
+from time import perf_counter
+
+# number of source cells a generation run may fail to find a legal path from before starting
+# over, in the shortest runs of the restart schedule (runs that fill the grid rarely fail more
+# than a few times, while runs that are stuck fail for almost every cell)
+DEFAULT_UNIT = 4
+
+# number of times generation may start over if no other limit is given
+DEFAULT_RESTARTS = 100
+
+class Budget:
+    """
+    class to bound how much work flow generation may do, and to report how it went; runs of the
+    generation are restarted from scratch on the Luby schedule (unit * 1, 1, 2, 1, 1, 2, 4, ...
+    failed source cells per run)
+
+    optional attributes (default value):
+    ------------------------------------
+    @attribute  seconds         :   wall-clock time generation may take, in seconds (None, for no limit)
+    @attribute  steps           :   number of source cells generation may search paths from (None, for no limit)
+    @attribute  restarts        :   number of times generation may start over (DEFAULT_RESTARTS; None for no limit)
+    @attribute  unit            :   number of failed source cells allowed in the shortest runs (DEFAULT_UNIT)
+
+    internal attributes:
+    --------------------
+    @attribute  deadline        :   perf_counter() time generation has to stop by (None if there's no time limit)
+    @attribute  stepsUsed       :   number of source cells searched so far
+    @attribute  restartsUsed    :   number of times generation has started over so far
+    @attribute  finished        :   boolean of whether generation filled the grid
+    """
+
+    @staticmethod
+    def getLubyTerm(i):
+        """
+        get a term of the Luby sequence (1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8, ...)
+
+        @param  i   :   1-indexed position of the term
+
+        @return     :   the i-th term of the sequence
+        """
+
+        # the sequence up to position 2^k - 1 is two copies of the sequence up to position
+        # 2^(k - 1) - 1 followed by 2^(k - 1)
+        while True:
+            k = i.bit_length()
+
+            if i == (1 << k) - 1:
+                return 1 << (k - 1)
+
+            i -= (1 << (k - 1)) - 1
+
+    def __init__(self, seconds=None, steps=None, restarts=DEFAULT_RESTARTS, unit=DEFAULT_UNIT):
+        """
+        constructor for the Budget class
+
+        See class docstring for parameters
+        """
+
+        self.seconds = seconds
+        self.steps = steps
+        self.restarts = restarts
+        self.unit = unit
+
+        self.start()
+
+    def start(self):
+        """
+        reset the budget's usage for a new generation
+
+        """
+
+        if self.seconds is None:
+            self.deadline = None
+        else:
+            self.deadline = perf_counter() + self.seconds
+
+        self.stepsUsed = 0
+        self.restartsUsed = 0
+        self.finished = False
+
+    def isExpired(self):
+        """
+        determine whether generation has used up its time or steps
+
+        @return :   True if generation has to stop; False otherwise
+        """
+
+        if not self.steps is None and self.stepsUsed >= self.steps:
+            return True
+
+        return not self.deadline is None and perf_counter() >= self.deadline
+
+    def spend(self):
+        """
+        use up one step (one source cell to search paths from), if the budget allows it
+
+        @return :   True if the step can be taken; False if generation has to stop
+        """
+
+        if self.isExpired():
+            return False
+
+        self.stepsUsed += 1
+
+        return True
+
+    def canRestart(self):
+        """
+        determine whether generation may start over
+
+        @return :   True if there is budget left for another run; False otherwise
+        """
+
+        if not self.restarts is None and self.restartsUsed >= self.restarts:
+            return False
+
+        return not self.isExpired()
+
+    def getCutoff(self):
+        """
+        get the number of source cells the current run may fail to find a legal path from before
+        it is abandoned
+
+        @return :   number of failures allowed in the current run
+        """
+
+        return self.unit * Budget.getLubyTerm(self.restartsUsed + 1)
@@ -1,4 +1,3 @@
-import pyglet
 import graphics
 import grid
 import direction
@@ -21,7 +20,8 @@ class Flow:
     --------------------
     @attribute path             :   list of cells the flow takes up, in drawing order
     @attribute flowBatch        :   batch to hold all of the flow's graphics (lines for the path
-                                    and circles for the endpoints)
+                                    and circles for the endpoints); None until the flow's graphics
+                                    are first generated, so flows that are never drawn don't need pyglet
     @attribute pathLines        :   list of vertex lists used to draw the lines of the flow's path;
                                     pathLines[0] is the line between path[0] and path[1], etc.
     @attribute endpointCircles  :   list of vertex lists for the 0) first and 1) second endpoints'
@@ -49,7 +49,7 @@ class Flow:
             if self.grid.isEmpty(cell):
                 self.grid.setCell(cell, self.index)
 
-        self.flowBatch = pyglet.graphics.Batch()
+        self.flowBatch = None
         self.pathLines = []
         self.endpointCircles = [ None, None ]
 
@@ -114,6 +114,11 @@ class Flow:
 
         """
 
+        if self.flowBatch is None:
+            import pyglet
+
+            self.flowBatch = pyglet.graphics.Batch()
+
         self.resetGraphics()
         self.pathLines = [ None for i in range(len(self.path) - 1) ]
 
@@ -149,4 +154,7 @@ class Flow:
 
         """
 
+        if self.flowBatch is None:
+            self.updateGraphics()
+
         self.flowBatch.draw()
@@ -1,85 +1,270 @@
 from grid import Grid
 from flow import Flow
-from random import random, shuffle, seed, choices
+from pathtree import PathTree
+from budget import Budget
+from stats import Stats
+import backbite
+import bitboard
+from random import Random, random
 from datetime import datetime
 from math import floor, ceil
-import direction
-
-"""
-# DEBUG
-from time import process_time
-gdmp_calls = []
-gec_calls = []
-"""
+from array import array
+from time import perf_counter
+from multiprocessing import Pool
+from collections import deque
+import itertools
+import os
 
 """
 functions for handling flow generation
 
 """
 
-# TODO: develop function combinePaths() to selectively combine paths legally *after*
-# the flow generation process to reduce the number of total flows in the grid (sometimes)
-# several 3- or 4-cell paths are generated which could be combined for a better overall
-# flow generation; OR do this during flow generation
+# largest number of unoccupied neighbors a cell can have (i.e. the largest edge weight
+# used in the degree-minimized shortest path search)
+MAX_DEGREE = 4
 
-def getDegreeMinimizedShortestPaths(grid, source):
+# fewest cells a grid needs for the sizes of its components of unoccupied cells to be found with
+# bitboard flood fills instead of union-find (see getEmptyComponentSizes())
+BITBOARD_MIN_CELLS = 200
+
+# generation engines (see generateFlows()): every flow is found with the degree-minimized
+# shortest path search, every flow is first tried as a random walk, or the flows are cut from a
+# random Hamiltonian path over the whole grid (see backbite.py)
+SEARCH_ENGINE = "search"
+WALK_ENGINE = "walk"
+BACKBITE_ENGINE = "backbite"
+
+ENGINES = [ SEARCH_ENGINE, WALK_ENGINE, BACKBITE_ENGINE ]
+
+# number of cells an illegal random walk may be cut back by to try to make it legal (see walkFlow())
+WALK_TRUNCATIONS = 8
+
+# number of rows and columns in each tile of a tiled grid (see generateTiled()), and the fewest
+# rows or columns a tile may have
+DEFAULT_TILE_SIZE = 16
+MIN_TILE_LENGTH = 3
+
+# grid reused by every task run in a generateMany() worker process (see initGenerateWorker())
+worker_grid = None
+
+def getDegreeMinimizedPathTree(grid, source):
     """
     find the shortest paths from the start cell to all reachable unoccupied cells in the grid with
-    minimum total cells.degree()
+    minimum total cells.degree(), working on flat cell indices (see Grid)
 
     @param      grid        :   grid of the starting cell
-    @param      source      :   starting cell we find paths for
+    @param      source      :   index of the starting cell we find paths for
 
-    @return                 :   a dictionary giving the parent cell of each cell in its shortest path (or None if
-                                the cell is unreachable)
+    @return                 :   PathTree of the paths (cells are added to it in the order they were
+                                visited, i.e. by nondecreasing total degree)
     """
 
     # use Dial's algorithm (same as Dijkstra but optimized for bounded integer weights) to
     # find all SSSPs with w(u, v) = grid.degree(v)
 
-    assert len(grid.unoccupied) > 0, "No unoccupied cells available"
-    assert grid.isEmpty(source), "Source cell is already occupied"
+    assert grid.emptyCount > 0, "No unoccupied cells available"
+    assert grid.isEmptyAt(source), "Source cell is already occupied"
+
+    free, neighbors, degrees = grid.free, grid.neighbors, grid.degrees
 
     # set the maximum distance larger than any possible total degree of a path
-    MAX_DISTANCE = 4 * len(grid.unoccupied)
+    MAX_DISTANCE = MAX_DEGREE * grid.emptyCount + 1
 
     # initalize vertex "distances" (distance in this function refers to the sum
     # of the degrees of cells in paths from the source cell)
-    distances = { cell : MAX_DISTANCE for cell in grid.unoccupied }
+    distances = [ MAX_DISTANCE ] * grid.size
     distances[source] = 0
 
-    # initialize list of unvisited cells (ignoring occupied cells)
-    unvisited = list(grid.unoccupied)
+    # initialize the flags of cells whose final distance is known
+    visited = bytearray(grid.size)
 
     # initialize returned objects
-    parents = { cell : None for cell in grid.unoccupied }
+    parents, depths, order = [ None ] * grid.size, [ None ] * grid.size, []
+    depths[source] = 0
+
+    # every edge weight is at most MAX_DEGREE, so all queued distances lie within
+    # MAX_DEGREE of the distance currently being processed; a circular array of
+    # MAX_DEGREE + 1 buckets indexed by (distance % number of buckets) is enough
+    num_buckets = MAX_DEGREE + 1
+    buckets = [ [] for i in range(num_buckets) ]
+    buckets[0].append(source)
+
+    queued, distance = 1, 0
+    while queued > 0:
+        bucket = buckets[distance % num_buckets]
+
+        while len(bucket) > 0:
+            cell = bucket.pop()
+            queued -= 1
+
+            # a cell is queued again every time its distance decreases, so skip stale
+            # entries for cells that have already been visited
+            if visited[cell] == 1:
+                continue
+
+            visited[cell] = 1
+            order.append(cell)
+
+            # iterate through all neighbors of the current minimum-distance cell
+            for adj_cell in neighbors[cell]:
+                if free[adj_cell] == 1 and visited[adj_cell] == 0:
+                    # if we can reach this neighbor cell "faster" (with lesser total degree) via the current
+                    # minimum-distance cell, update the neighbor's cell distance and make the minimum-distance
+                    # cell its parent
+                    adj_distance = distance + degrees[adj_cell]
+
+                    if adj_distance < distances[adj_cell]:
+                        distances[adj_cell] = adj_distance
+                        parents[adj_cell] = cell
+                        depths[adj_cell] = depths[cell] + 1
 
-    while len(unvisited) > 0:
-        min_distance = MAX_DISTANCE + 1
-        min_cell = None
+                        buckets[adj_distance % num_buckets].append(adj_cell)
+                        queued += 1
 
-        # find the cell with minimum calculated distance from the source
-        for cell in unvisited:
-            if distances[cell] < min_distance:
-                min_distance, min_cell = distances[cell], cell
+        distance += 1
 
-        # mark this cell as visited
-        unvisited.remove(min_cell)
+    return PathTree(source, parents, depths, order)
 
-        # iterate through all neighbors of the minimum-distance cell
-        for dir in direction.directions:
-            adj_cell = direction.next[dir](*min_cell)
+def getDegreeMinimizedShortestPaths(grid, source):
+    """
+    find the shortest paths from the start cell to all reachable unoccupied cells in the grid with
+    minimum total cells.degree()
 
-            if grid.inBounds(adj_cell) and grid.isEmpty(adj_cell) and adj_cell in unvisited:
-                # if we can reach this neighbor cell "faster" (with lesser total degree) via the current
-                # minimum-distance cell, update the neighbor's cell distance and make the minimum-distance
-                # cell its parent
-                if distances[adj_cell] > distances[min_cell] + grid.degree(adj_cell):
-                    distances[adj_cell] = distances[min_cell] + grid.degree(adj_cell)
-                    parents[adj_cell] = min_cell
+    @param      grid        :   grid of the starting cell
+    @param      source      :   starting cell we find paths for
+
+    @return                 :   a dictionary giving the parent cell of each cell in its shortest path (or None if
+                                the cell is unreachable)
+    """
+
+    assert len(grid.unoccupied) > 0, "No unoccupied cells available"
+    assert grid.isEmpty(source), "Source cell is already occupied"
+
+    tree = getDegreeMinimizedPathTree(grid, grid.getIndex(source))
+
+    # translate the parent indices back into (col, row) pairs
+    cells = grid.cells
+    parents = { cell : None for cell in grid.unoccupied }
+    for index in tree.order[1:]:
+        parents[cells[index]] = cells[tree.parents[index]]
 
     return parents
 
+def getEmptyComponentIndices(grid, empty=None):
+    """
+    perform a BFS to identify the connected components of empty cells in the grid, working on
+    flat cell indices (see Grid)
+
+    @param      grid    :   grid containing the relevant cells
+    @optional   empty   :   list of unoccupied cell indices to use *instead* of the grid's
+                            unoccupied cells
+
+    @return             :   list of lists of cell indices separated by components
+    """
+
+    neighbors = grid.neighbors
+
+    if empty is None:
+        unoccupied, allowed = grid.getEmptyIndices(), grid.free
+    else:
+        unoccupied, allowed = list(empty), bytearray(grid.size)
+        for cell in unoccupied:
+            allowed[cell] = 1
+
+    assert len(unoccupied) > 0
+
+    # flag cells once they've been put into a component
+    visited, components = bytearray(grid.size), []
+
+    # seed a new component with each cell (in order) that isn't in a component yet, so
+    # the cells are never rescanned for seeds
+    for first_cell in unoccupied:
+        if visited[first_cell] == 1:
+            continue
+
+        # the queue is never popped; reading it in order gives the BFS, and once the search is
+        # over it holds exactly the cells of this component
+        visited[first_cell], queue = 1, [ first_cell ]
+        for cell in queue:
+            # add neighbors of this cell that have not been visited to the queue
+            for neighbor in neighbors[cell]:
+                if allowed[neighbor] == 1 and visited[neighbor] == 0:
+                    visited[neighbor] = 1
+                    queue.append(neighbor)
+
+        components.append(queue)
+
+    return components
+
+def getEmptyComponentSizes(grid, empty=None):
+    """
+    find the sizes of the connected components of empty cells in the grid using union-find,
+    without building the list of cells in each component; the grid's own unoccupied cells are
+    flood-filled as a bitboard instead (see bitboard.py), which is several times faster on all
+    but the smallest grids
+
+    @param      grid    :   grid containing the relevant cells
+    @optional   empty   :   list of unoccupied cell indices to use *instead* of the grid's
+                            unoccupied cells
+
+    @return             :   list of the sizes of the components, in order of their lowest index
+    """
+
+    if empty is None and grid.size >= BITBOARD_MIN_CELLS:
+        assert grid.emptyCount > 0
+
+        components = bitboard.iterComponents(grid.emptyBits, grid.rows, grid.cols)
+
+        return [ bitboard.countCells(component) for component in components ]
+
+    neighbors = grid.neighbors
+
+    if empty is None:
+        unoccupied, allowed = grid.getEmptyIndices(), grid.free
+    else:
+        unoccupied, allowed = list(empty), bytearray(grid.size)
+        for cell in unoccupied:
+            allowed[cell] = 1
+
+    assert len(unoccupied) > 0
+
+    # every cell starts out as the root of its own set
+    roots = list(range(grid.size))
+
+    # union each cell with its neighbors of lower index; every edge between allowed cells is
+    # seen once, from its higher-index end
+    for cell in unoccupied:
+        for neighbor in neighbors[cell]:
+            if neighbor < cell and allowed[neighbor] == 1:
+                # find both roots, halving the paths on the way up
+                root = cell
+                while not roots[root] == root:
+                    roots[root] = roots[roots[root]]
+                    root = roots[root]
+
+                other = neighbor
+                while not roots[other] == other:
+                    roots[other] = roots[roots[other]]
+                    other = roots[other]
+
+                # keep the lower index as the root
+                if root < other:
+                    roots[other] = root
+                elif other < root:
+                    roots[root] = other
+
+    # count the cells under each root
+    sizes = {}
+    for cell in unoccupied:
+        root = cell
+        while not roots[root] == root:
+            root = roots[root]
+
+        sizes[root] = sizes.get(root, 0) + 1
+
+    return list(sizes.values())
+
 def getEmptyComponents(grid, empty=None):
     """
     perform a BFS to identify the connected components of empty cells in the grid
@@ -91,67 +276,416 @@ def getEmptyComponents(grid, empty=None):
     @return             :   list of lists of cells separated by components
     """
 
-    if empty is None:
-        unoccupied = list(grid.unoccupied)
-    else:
-        unoccupied = list(empty)
+    if not empty is None:
+        empty = [ grid.getIndex(cell) for cell in empty ]
 
-    assert len(unoccupied) > 0
+    cells = grid.cells
+    components = getEmptyComponentIndices(grid, empty=empty)
 
-    # initialize the queue and visited dictionary
-    visited, queue, components = { cell : False for cell in unoccupied }, [], []
+    return [ [ cells[index] for index in component ] for component in components ]
 
-    # push the source cell of the first component into the queue
-    queue.append(unoccupied[0])
-    components.append([])
+def isLegalComponentSize(size):
+    """
+    determine whether a component of unoccupied cells of the given size may be left in the grid
 
-    while len(queue) > 0:
-        # find all the cells in this current component
-        while len(queue) > 0:
-            # pop the first element out of the queue and add it to this component
-            cell, visited[cell] = queue.pop(0), True
-            components[-1].append(cell)
+    NOTE: blocks of size 4, if arranged in a 2x2 square, cannot be filled legally; multiple arrangements of
+    blocks of size 5 also cannot be filled legally; blocks with at least 6 unoccupied cells, however can
+    always be filled legally
 
-            # add neighbors of the popped cell that have not been visited to the queue
-            for dir in direction.directions:
-                neighbor = direction.next[dir](*cell)
+    @param  size    :   number of cells in the component
 
-                if grid.inBounds(neighbor) and grid.isEmpty(neighbor) and visited[neighbor] == False:
-                    visited[neighbor] = True
-                    queue.append(neighbor)
+    @return         :   True if the size is 0, 3 or at least 6; False otherwise
+    """
+
+    return size == 0 or size == 3 or size >= 6
 
-        # determine if there are any remaining unvisited cells; if so, put the first
-        # one we find into a new component
-        for cell in visited.keys():
-            if visited[cell] == False:
-                queue.append(cell)
-                visited[cell] = True
-                components.append([])
-                break
+def getLegalSinkIndices(grid, tree, stats=None):
+    """
+    find which of the degree-minimized paths from the source cell can legally be used as the next
+    flow, working on flat cell indices (see Grid)
 
-        # if we reach this point and the queue is still empty, there are
-        # no more unvisited empty cells, so we've found all the components
+    a path is legal if it is at least 3 cells long and, once its cells are occupied, every component
+    of unoccupied cells left in the grid has a legal size (see isLegalComponentSize()); this gives the
+    same decisions as occupying each path in turn and calling getEmptyComponents(), but handles all
+    paths together by walking the shortest path tree depth-first, removing each entered cell from
+    its component on the way down and restoring it on the way back up
 
-    return components
+    @param      grid    :   grid containing the relevant cells
+    @param      tree    :   PathTree of the paths from getDegreeMinimizedPathTree()
+    @optional   stats   :   Stats to count the rejected sinks in, by rule, and to time the component check in
+
+    @return             :   list of the indices of sinks with legal paths, in visit order
+    """
+
+    neighbors = grid.neighbors
+    source, parents, depths, order = tree.source, tree.parents, tree.depths, tree.order
+    block_size = tree.getSize()
+
+    # find the children of each cell in the shortest path tree (parents always come before
+    # their children)
+    children = { cell : [] for cell in order }
+    for cell in order[1:]:
+        children[parents[cell]].append(cell)
+
+    # mark the cells of the source's block that are not on the current path
+    present = bytearray(grid.size)
+    for cell in order[1:]:
+        present[cell] = 1
+
+    # components of unoccupied cells outside of the source's block aren't affected by its
+    # paths, so they only need to be checked once (the block itself is one of the components
+    # with block_size cells)
+    if not stats is None:
+        start_time = perf_counter()
+
+    other_sizes = getEmptyComponentSizes(grid)
+
+    if not stats is None:
+        stats.addCall(Stats.COMPONENTS, start_time)
+
+    other_sizes.remove(block_size)
+    others_legal = all([ isLegalComponentSize(size) for size in other_sizes ])
+
+    legal = bytearray(grid.size)
+
+    # if some other component is already illegal, only paths filling the whole block are legal
+    # (the remaining components aren't checked for those paths)
+    if not others_legal:
+        for cell in order[1:]:
+            if tree.getLength(cell) == block_size and block_size >= 3:
+                legal[cell] = 1
+            elif not stats is None:
+                path_length = tree.getLength(cell)
+
+                if path_length < 3:
+                    stats.addRejection(cell, Stats.SHORT)
+                elif not isLegalComponentSize(block_size - path_length):
+                    stats.addRejection(cell, Stats.BLOCK)
+                else:
+                    stats.addRejection(cell, Stats.COMPONENT)
+
+        return [ cell for cell in order[1:] if legal[cell] == 1 ]
+
+    # label the components left in the block once the source is occupied, and count how many
+    # of them have illegal sizes
+    labels, sizes, illegal = [ -1 ] * grid.size, [], 0
+    for cell in order[1:]:
+        if labels[cell] == -1:
+            labels[cell], queue = len(sizes), [ cell ]
+            for current in queue:
+                for neighbor in neighbors[current]:
+                    if present[neighbor] == 1 and labels[neighbor] == -1:
+                        labels[neighbor] = len(sizes)
+                        queue.append(neighbor)
+
+            sizes.append(len(queue))
+            illegal += int(not isLegalComponentSize(len(queue)))
+
+    # searches run when a removed cell may split its component mark the cells they reach with
+    # their own number; numbers are never reused, so the marks never need to be cleared
+    marks, next_mark = [ -1 ] * grid.size, 0
+
+    # each entered cell records (component, old size, old illegal count, [ (label, cells) ] of the
+    # components split off of it) so its removal can be undone
+    trail = []
+
+    # walk the shortest path tree; the complement ~cell of a cell marks where to restore it
+    stack = list(reversed(children[source]))
+    while len(stack) > 0:
+        cell = stack.pop()
+
+        if cell < 0:
+            cell = ~cell
+            component, old_size, illegal, split = trail.pop()
+
+            for label, cells in reversed(split):
+                sizes.pop()
+                for split_cell in cells:
+                    labels[split_cell] = component
+
+            sizes[component] = old_size
+            present[cell] = 1
+            continue
+
+        # remove the cell from its component
+        component = labels[cell]
+        old_size, old_illegal, split = sizes[component], illegal, []
+        present[cell] = 0
+
+        adjacent = [ neighbor for neighbor in neighbors[cell] if present[neighbor] == 1 ]
+
+        # group together the neighbors joined by the diagonal cell between them; two neighbors
+        # on opposite sides of the cell are only joined through a third neighbor
+        seeds = []
+        if len(adjacent) > 1:
+            groups = list(range(len(adjacent)))
+            for i in range(len(adjacent)):
+                for j in range(i + 1, len(adjacent)):
+                    diagonal = adjacent[i] + adjacent[j] - cell
+                    if not diagonal == cell and present[diagonal] == 1 and not groups[i] == groups[j]:
+                        old_group = groups[j]
+                        groups = [ groups[i] if group == old_group else group for group in groups ]
+
+            seeds = [ adjacent[i] for i in range(len(adjacent)) if groups.index(groups[i]) == i ]
+
+        # the neighbors could still be joined further away, so search from each group in lockstep
+        # until at most one search is unfinished; the pieces explored by finished searches are the
+        # ones split off (the last piece may be far larger, so it is never explored fully)
+        if len(seeds) > 1:
+            first_mark = next_mark
+            next_mark += len(seeds)
+
+            queues, heads = [], [ 0 ] * len(seeds)
+            joined = list(range(len(seeds)))
+            for k in range(len(seeds)):
+                marks[seeds[k]] = first_mark + k
+                queues.append([ seeds[k] ])
+
+            while True:
+                unfinished = set()
+                for k in range(len(seeds)):
+                    if heads[k] < len(queues[k]):
+                        current = queues[k][heads[k]]
+                        heads[k] += 1
+
+                        for neighbor in neighbors[current]:
+                            if present[neighbor] == 1:
+                                mark = marks[neighbor]
+                                if mark < first_mark:
+                                    marks[neighbor] = first_mark + k
+                                    queues[k].append(neighbor)
+                                elif not joined[mark - first_mark] == joined[k]:
+                                    # the two searches met, so they are exploring the same piece
+                                    old_join = joined[mark - first_mark]
+                                    joined = [ joined[k] if join == old_join else join for join in joined ]
+
+                for k in range(len(seeds)):
+                    if heads[k] < len(queues[k]):
+                        unfinished.add(joined[k])
+
+                if len(unfinished) < 2 or len(set(joined)) < 2:
+                    break
+
+            pieces = {}
+            for k in range(len(seeds)):
+                pieces.setdefault(joined[k], []).extend(queues[k])
+
+            if len(pieces) > 1:
+                # the unfinished piece (or else the largest one) keeps the component's label
+                if len(unfinished) == 1:
+                    kept = unfinished.pop()
+                else:
+                    kept = max(pieces.keys(), key = lambda join : len(pieces[join]))
+
+                for join in pieces.keys():
+                    if not join == kept:
+                        label = len(sizes)
+                        for split_cell in pieces[join]:
+                            labels[split_cell] = label
+
+                        sizes.append(len(pieces[join]))
+                        illegal += int(not isLegalComponentSize(len(pieces[join])))
+                        split.append((label, pieces[join]))
+
+        # whatever wasn't split off stays in the component
+        sizes[component] = old_size - 1 - sum([ len(cells) for label, cells in split ])
+        illegal += int(not isLegalComponentSize(sizes[component])) - int(not isLegalComponentSize(old_size))
+
+        trail.append((component, old_size, old_illegal, split))
+
+        # check the path from the source to this cell
+        path_length = tree.getLength(cell)
+        remaining_in_block = block_size - path_length
+        if path_length >= 3 and isLegalComponentSize(remaining_in_block):
+            if remaining_in_block == 0 or illegal == 0:
+                legal[cell] = 1
+            elif not stats is None:
+                stats.addRejection(cell, Stats.COMPONENT)
+        elif not stats is None:
+            stats.addRejection(cell, Stats.SHORT if path_length < 3 else Stats.BLOCK)
+
+        stack.append(~cell)
+        stack.extend(reversed(children[cell]))
+
+    return [ cell for cell in order[1:] if legal[cell] == 1 ]
+
+def getLegalSinks(grid, source):
+    """
+    find the sinks whose degree-minimized paths from the source cell can legally be used as the
+    next flow (see getLegalSinkIndices())
+
+    @param  grid    :   grid containing the relevant cells
+    @param  source  :   source cell of the paths
+
+    @return         :   list of sink cells with legal paths
+    """
+
+    tree = getDegreeMinimizedPathTree(grid, grid.getIndex(source))
+
+    return [ grid.cells[cell] for cell in getLegalSinkIndices(grid, tree) ]
+
+def getRandom(seed=None):
+    """
+    get the random generator to draw from while generating flows
 
-def generateFlows(grid):
+    @optional   seed    :   random.Random instance (used as-is), or a seed for a new one (None
+                            seeds it from the system's randomness)
+
+    @return             :   random.Random instance
+    """
+
+    if isinstance(seed, Random):
+        return seed
+
+    return Random(seed)
+
+def iterSourceIndices(grid, rng):
+    """
+    lazily order the unoccupied cells of the grid by ascending degree, breaking ties uniformly at
+    random; the first cell is drawn straight from the grid's lowest degree bucket in O(1), and the
+    rest are only ordered if they're asked for (the grid must not change while iterating)
+
+    @param  grid    :   grid whose unoccupied cells are ordered
+    @param  rng     :   random.Random instance to break ties with
+
+    @return         :   generator of unoccupied cell indices, in order of ascending degree
+    """
+
+    lowest = grid.getLowestDegree()
+
+    if lowest is None:
+        return
+
+    bucket = grid.getDegreeBucket(lowest)
+    first = bucket[rng.randrange(len(bucket))]
+
+    yield first
+
+    # only if the first cell didn't work out: the remaining cells of each bucket, shuffled
+    for degree in range(lowest, MAX_DEGREE + 1):
+        remaining = [ cell for cell in grid.getDegreeBucket(degree) if not cell == first ]
+        rng.shuffle(remaining)
+
+        yield from remaining
+
+def randomStepAt(grid, cell, flow_index, rng):
     """
-    randomly generate solved flow puzzles
+    choose a random cell to extend a flow's path with from its last cell (one step in a random walk),
+    for paths already placed in the grid
+
+    NOTE: this isn't a uniform random step: the step is drawn uniformly only among the allowed
+    neighbors of lowest degree (like the degree-minimized search, so the walk hugs the edges of the
+    grid and other flows instead of cutting off pockets of unoccupied cells); walks taking uniform
+    steps were only legal about a third of the time, and then only about 7 cells long, so most of
+    them fell back on the search
+
+    @param  grid        :   grid the path is placed in
+    @param  cell        :   index of the last cell in the path
+    @param  flow_index  :   value the path's cells are assigned in the grid
+    @param  rng         :   random.Random instance to draw the step from
+
+    @return             :   index of an unoccupied neighbor of the cell that's only adjacent to
+                            this one cell of the path (None if there's no such neighbor)
+    """
+
+    # the next cell needs to be unoccupied and have a flow degree < 2 (it's adjacent to the last
+    # cell, and mustn't touch any other cell of the path)
+    steps = [   next_cell for next_cell in grid.neighbors[cell]
+                if grid.isEmptyAt(next_cell) and grid.valueDegreeAt(next_cell, flow_index) < 2   ]
+
+    if len(steps) == 0:
+        return None
+
+    # randomly choose among the steps of lowest degree
+    lowest = min(grid.degreeAt(next_cell) for next_cell in steps)
+    steps = [ next_cell for next_cell in steps if grid.degreeAt(next_cell) == lowest ]
 
-    @param  grid    :   grid the flows will be placed on
+    return steps[rng.randrange(len(steps))]
 
-    @return         :   list containing all viable paths used to fill the grid
+def walkFlow(grid, source, flow_index, rng, stats=None):
     """
+    place a flow by randomly walking from the source cell (see randomStepAt()) until the walk gets
+    stuck; the walk is only kept if it's a legal path, i.e. at least 3 cells long and leaving every
+    component of unoccupied cells with a legal size (see isLegalComponentSize()); an illegal walk is
+    cut back by up to WALK_TRUNCATIONS cells, since it's usually its end that cuts off an illegal pocket
+
+    the walk itself takes time proportional to its length, but each check of its components is a
+    pass over the whole grid, so a walk takes O(length + checks * cells) time, with between 1 and
+    WALK_TRUNCATIONS + 1 checks (most walks are legal, or not, after the first one)
+
+    @param      grid        :   grid the flow is placed in
+    @param      source      :   index of the unoccupied cell to start walking from
+    @param      flow_index  :   value to assign the path's cells in the grid
+    @param      rng         :   random.Random instance to draw the walk from
+    @optional   stats       :   Stats to time the walk's component checks in
+
+    @return                 :   list of the path's cell indices, from the source to the end of the walk
+                                (None if the walk wasn't legal, in which case the grid is left unchanged)
+    """
+
+    # record the walk so it can be taken back
+    start = grid.checkpoint()
+
+    path, cell = [], source
+    while not cell is None:
+        grid.setAt(cell, flow_index)
+        path.append(cell)
+
+        cell = randomStepAt(grid, cell, flow_index, rng)
 
-    # TODO: make the first flow path a random walk instead of being calculated
+    for truncation in range(WALK_TRUNCATIONS + 1):
+        if len(path) < 3:
+            break
 
-    final_paths, index = [], 0
+        if grid.emptyCount == 0:
+            legal = True
+        else:
+            if not stats is None:
+                start_time = perf_counter()
 
-    tries = 0
+            legal = all(isLegalComponentSize(size) for size in getEmptyComponentSizes(grid))
 
-    while len(grid.unoccupied) > 0 and tries < 100:
-        # sort the empty cells in order of ascending degree
-        sorted_unoccupied = sorted(grid.unoccupied, key = lambda cell : grid.degree(cell))
+            if not stats is None:
+                stats.addCall(Stats.COMPONENTS, start_time)
+
+        if legal:
+            grid.commit(start)
+
+            return path
+
+        # take back the last cell of the walk and check again
+        grid.resetAt(path.pop())
+
+    grid.rollback(start)
+    grid.commit(start)
+
+    return None
+
+def placeFlows(grid, rng, budget, engine=SEARCH_ENGINE, stats=None):
+    """
+    make one run at filling the grid with flows, working on flat cell indices (see Grid); the run
+    gives up once the budget is used up, once it has failed to find a legal path from more source
+    cells than the budget's current cutoff, or once no source cell has a legal path
+
+    @param      grid    :   grid the flows will be placed on
+    @param      rng     :   random.Random instance to draw random choices from
+    @param      budget  :   Budget bounding the run
+    @optional   engine  :   engine placing the flows (see generateFlows())
+    @optional   stats   :   Stats to record the run in
+
+    @return             :   list of the paths placed in the grid during this run, as lists of cell
+                            indices (the run filled the grid if no unoccupied cells are left)
+    """
+
+    paths, index = [], 0
+
+    failures, cutoff = 0, budget.getCutoff()
+
+    cells = grid.cells
+
+    while grid.emptyCount > 0:
+        # order the empty cells by ascending degree (ties in random order), only as far as needed
+        sources = iterSourceIndices(grid, rng)
 
         """
         # DEBUG
@@ -160,156 +694,90 @@ def generateFlows(grid):
         """
 
         # choose a cell to start this flow with
-        attempts = 0
-        while attempts < len(grid.unoccupied):
-            # get the empty cell of lowest degree that we haven't tried yet (the "source" of this flow)
+        attempts, placed = 0, False
+        while attempts < grid.emptyCount and not placed:
+            # every source cell tried costs a step of the budget
+            if not budget.spend():
+                return paths
 
-            # TODO: randomize which lowest-degree cell we use; ex. if there's multiple 1-degree cells,
-            # randomly choose one of them instead of whichever one gets sorted first in the empty list
+            # get the empty cell of lowest degree that we haven't tried yet (the "source" of this flow)
+            source = next(sources)
 
-            source = sorted_unoccupied[attempts]
+            if not stats is None:
+                stats.addSource(grid, source, index)
 
-            """
-            # DEBUG
-            print("Source: " + str(source))
-            """
+            # the first flow of every run (and every flow, for the walk engine) is first tried as a
+            # random walk, which is far cheaper than searching paths; the search is only needed if
+            # the walk wasn't legal (for the search engine, walking the first flow carries out the
+            # original TODO to make it a random walk: the first search of a run is its most expensive,
+            # over the whole board and checking every sink, while a walk on an empty board is almost
+            # always legal; this does change which boards the search engine generates, since their
+            # first flow comes from the walk rather than the search's length-weighted choice)
+            if engine == WALK_ENGINE or index == 0:
+                if not stats is None:
+                    start_time = perf_counter()
 
-            """
-            # DEBUG
-            start_time = process_time()
-            """
+                path = walkFlow(grid, source, index, rng, stats)
 
-            # find all directed edges of paths from this source cell to other empty cells with minimum total degree;
-            # also get a list of cells in the source's component block (not including the source)
-            parents = getDegreeMinimizedShortestPaths(grid, source)
+                if not stats is None:
+                    stats.addCall(Stats.WALK, start_time)
 
-            """
-            # DEBUG
-            gdmp_calls.append(process_time() - start_time)
-            """
+                if not path is None:
+                    paths.append(path)
 
-            """
-            # DEBUG
-            print("Parents:")
-            for cell in parents.keys():
-                print(str(cell) + ": " + str(parents[cell]))
-            """
+                    if not stats is None:
+                        stats.addPlacement(path, index, True)
 
-            # find which cells are within this source's component block (NOT including the source)
-            block = []
-            for cell in parents.keys():
-                # if the parent of this cell is 'None', then the source cannot reach it
-                if not parents[cell] == None:
-                    block.append(cell)
+                    index += 1
+                    placed = True
 
-            block_size = len(block) + 1
+                    continue
 
             """
             # DEBUG
-            print("Source component: " + str(block))
-            print("Source component size: " + str(block_size))
+            print("Source: " + str(source))
             """
 
-            # find all the minimized paths from this source cell by following the edges (note that the generated paths
-            # do not include the source)
-            minimized_paths = {}
-            for cell in block:
-                minimized_paths[cell], current = [], cell
-                while not current == source:
-                    minimized_paths[cell].append(current)
+            if not stats is None:
+                start_time = perf_counter()
 
-                    assert not parents[current] == None, "No parent cell for " + str(current)
-
-                    current = parents[current]
+            # find all directed edges of paths from this source cell to other empty cells with minimum total degree;
+            # the tree also holds the cells in the source's component block and every path's length, so no path
+            # needs to be built until one is chosen
+            tree = getDegreeMinimizedPathTree(grid, source)
 
-                # since we follow each path from the sink to the source, we need to reverse the current paths
-                minimized_paths[cell].reverse()
+            if not stats is None:
+                stats.addCall(Stats.SEARCH, start_time)
 
             """
             # DEBUG
-            print("Minimized paths:")
-            for sink in minimized_paths.keys():
-                print(str(sink) + ": " + str(minimized_paths[sink]))
+            print("Parents:")
+            for cell in tree.order:
+                print(str(cells[cell]) + ": " + str(tree.parents[cell]))
+            print("Source component size: " + str(tree.getSize()))
             """
 
-            # find which sinks are of legal length (at least 3 cells long) and fit properly within the block
-            potential_sinks = []
-            for sink in minimized_paths.keys():
-                path_length = len(minimized_paths[sink]) + 1
-
-                # find out how many unoccupied cells would be left in the source's component if we used this
-                # path for the next flow
-                remaining_in_block = block_size - path_length
-
-                assert remaining_in_block >= 0
-
-                # the block the flow resides in, if not empty, should have either 3 or at least 6 remaining unoccupied cells
-                # NOTE: blocks of size 4, if arranged in a 2x2 square, cannot be filled legally; multiple arrangements of
-                # blocks of size 5 also cannot be filled legally; blocks with at least 6 unoccupied cells, however can
-                # always be filled legally
-                if path_length >= 3 and (remaining_in_block == 0 or remaining_in_block == 3 or remaining_in_block >= 6):
-                    satisfied = True
-
-                    # test this path to see if occupying its cells will create illegal components
-                    # NOTE: if the path fills its component (remaining_in_block' == 0) we  don't need to check for this
-                    if remaining_in_block > 0:
-                        test_empty = list(sorted_unoccupied)
-
-                        # temporarily mark the cells in this path as occupied so we can find the resulting unoccupied components
-                        test_empty.remove(source)
-                        grid.setCell(source, index)
-                        for cell in minimized_paths[sink]:
-                            test_empty.remove(cell)
-                            grid.setCell(cell, index)
-
-                        """
-                        # DEBUG
-                        start_time = process_time()
-                        """
-
-                        # get the unoccupied components that would be made by this path
-                        components = getEmptyComponents(grid, empty=test_empty)
-
-                        """
-                        # DEBUG
-                        gec_calls.append(process_time() - start_time)
-                        """
-
-                        """
-                        # DEBUG
-                        print("Testing path: " + str(minimized_paths[sink]))
-                        print("Resulting components:")
-                        for component in components:
-                            print(component)
-                        """
-
-                        # see if the unoccupied components this path forms satisfies the 'remaining_in_block' rules
-                        for component in components:
-                            component_size = len(component)
-                            if not (component_size == 0 or component_size == 3 or component_size >= 6):
-                                satisfied = False
-                                break
-
-                        # unmark the cells of this path as occupied in the grid
-                        grid.resetCell(source)
-                        for cell in minimized_paths[sink]:
-                            grid.resetCell(cell)
-
-                    # if all the resulting components are legal, mark this path as usable
-                    if satisfied:
-                        assert satisfied == True
-                        potential_sinks.append(sink)
+            if not stats is None:
+                start_time = perf_counter()
+
+            # find which sinks have paths of legal length (at least 3 cells long) that leave every resulting
+            # component of unoccupied cells with a legal size (see getLegalSinkIndices())
+            potential_sinks = getLegalSinkIndices(grid, tree, stats)
+
+            if not stats is None:
+                stats.addCall(Stats.VALIDATION, start_time)
 
             # make sure at least one path is legal
             if len(potential_sinks) > 0:
                 # randomly choose a path that works and create the flow for it; we weight each path's
                 # probability of being chosen so that longer paths are more likely to be used
-                weights = [ len(potential_sinks[i]) for i in range(len(potential_sinks)) ]
-                sink = choices(potential_sinks, weights=weights)[0]
+                weights = [ tree.getLength(sink) for sink in potential_sinks ]
+                sink = rng.choices(potential_sinks, weights=weights)[0]
 
-                path = [ source ] + minimized_paths[sink]
+                # only the chosen path is ever built
+                path = tree.getPath(sink)
 
-                final_paths.append(path)
+                paths.append(path)
 
                 """
                 flows.append(Flow(  grid,
@@ -323,79 +791,396 @@ def generateFlows(grid):
                 # DEBUG
                 print("Path: " + str(path))
                 print("Path length: " + str(len(path)))
-                print("Resulting components:")
-                for component in components:
-                    print(component)
                 """
 
                 # remove all cells in the path from the list of unoccupied cells
                 for cell in path:
-                    assert grid.isEmpty(cell), "Final path cell " + str(cell) + " already occupied"
+                    assert grid.isEmptyAt(cell), "Final path cell " + str(cells[cell]) + " already occupied"
+
+                    grid.setAt(cell, index)
 
-                    grid.setCell(cell, index)
+                if not stats is None:
+                    stats.addPlacement(path, index, False)
 
                 # update the flow index and start the next flow
                 index += 1
-                break
+                placed = True
 
-            # if none of the paths were legal, try a new source cell
+            # if none of the paths were legal, try a new source cell, unless this run has already
+            # failed too often to be likely to fill the grid
             else:
                 attempts += 1
+                failures += 1
+
+                if not stats is None:
+                    stats.addFailure(source)
+
+                if failures > cutoff:
+                    return paths
 
             """
             # DEBUG
             print("\n")
             """
 
-        tries += 1
+        # if no source cell had a legal path, this run is stuck
+        if not placed:
+            return paths
+
+    return paths
+
+def generateFlows(grid, seed=None, budget=None, engine=SEARCH_ENGINE, stats=None):
+    """
+    randomly generate solved flow puzzles; every random choice is drawn from the given seed, so
+    generating flows for grids of the same size with the same integer seed gives the same paths
+
+    generation works in runs: whenever a run gets stuck (see placeFlows()), its flows are removed
+    and a new run starts from scratch, until the grid is filled or the budget runs out; the
+    budget also reports whether the grid was filled
+
+    @param      grid    :   grid the flows will be placed on
+    @optional   seed    :   random.Random instance or seed to draw random choices from (see getRandom())
+    @optional   budget  :   Budget limiting the time, steps and restarts generation may use (by default,
+                            only the number of restarts is limited)
+    @optional   engine  :   SEARCH_ENGINE to find each flow with the degree-minimized shortest path search
+                            (except for the first flow of a run, which is first tried as a random walk, see
+                            placeFlows()), or WALK_ENGINE
+                            to first try every flow as a random walk, falling back to the search only when
+                            the walk isn't legal, or BACKBITE_ENGINE to cut the flows from a random Hamiltonian
+                            path over the grid, which must be empty (a ValueError is raised otherwise), in time
+                            close to linear in its size (for very large grids; see backbite.placeBackbiteFlows());
+                            any other engine raises a ValueError
+    @optional   stats   :   Stats to record where generation spends its time in, added to what it
+                            already holds (None to record nothing)
+
+    @return             :   list containing all viable paths used to fill the grid (if the budget ran
+                            out first, the paths of the last run, which are left in the grid)
+    """
+
+    # check before anything is recorded, rather than leaving the grid's checkpoint open
+    if not engine in ENGINES:
+        raise ValueError("Unknown generation engine " + repr(engine))
+
+    if engine == BACKBITE_ENGINE and not grid.emptyCount == grid.size:
+        raise ValueError("The backbite engine only fills empty grids")
+
+    rng = getRandom(seed)
+
+    if budget is None:
+        budget = Budget()
+
+    budget.start()
+
+    if not stats is None:
+        stats.startGeneration(grid, engine)
+
+    # record the changes made to the grid so a run can be undone in time proportional to its size
+    start = grid.checkpoint()
+
+    while True:
+        if engine == BACKBITE_ENGINE:
+            paths = backbite.placeBackbiteFlows(grid, rng, budget, stats)
+        else:
+            paths = placeFlows(grid, rng, budget, engine, stats)
+
+        if grid.emptyCount == 0:
+            budget.finished = True
+            break
+
+        if not budget.canRestart():
+            break
+
+        # start over from scratch, removing the flows placed during the last run
+        grid.rollback(start)
+
+        budget.restartsUsed += 1
+
+        if not stats is None:
+            stats.addRestart()
+
+    grid.commit(start)
+
+    if not stats is None:
+        stats.endGeneration(grid, budget)
+
+    # the search works on flat cell indices; the returned paths are made of (col, row) pairs
+    cells = grid.cells
+
+    return [ [ cells[cell] for cell in path ] for path in paths ]
+
+def combinePaths(grid, paths, seed=None):
+    """
+    merge flows whose ends are adjacent, to reduce the number of flows in a generated grid (several
+    3- or 4-cell flows can often be joined into one); an optional stage after generateFlows(), in
+    O(n log n) time for n cells (see backbite.mergeFlows(), which the backbite engine also uses)
+
+    @param      grid    :   grid the paths fill
+    @param      paths   :   list of paths of (col, row) pairs, as returned by generateFlows()
+    @optional   seed    :   random.Random instance or seed to draw the merge order from (see getRandom())
+
+    @return             :   list of the merged paths of (col, row) pairs; each path's cells are
+                            assigned its index in the list in the grid
+    """
+
+    flows = [ [ grid.getIndex(cell) for cell in path ] for path in paths ]
+
+    for value, flow in enumerate(flows):
+        for cell in flow:
+            grid.setAt(cell, value)
+
+    cells = grid.cells
+
+    return [ [ cells[cell] for cell in flow ] for flow in backbite.mergeFlows(grid, flows, getRandom(seed)) ]
+
+def encodePaths(grid, paths):
+    """
+    pack a list of paths into a flat array of cell indices (see Grid), which is far smaller to
+    store or send between processes than lists of tuples; each path is stored as its length
+    followed by its cells
+
+    @param  grid    :   grid the paths are contained in
+    @param  paths   :   list of paths of (col, row) pairs
+
+    @return         :   'array' of path lengths and cell indices
+    """
+
+    # 2-byte entries are enough for any grid with fewer than 65536 cells
+    encoded = array('H' if grid.size < 2 ** 16 else 'L')
+
+    for path in paths:
+        encoded.append(len(path))
+        encoded.extend([ grid.getIndex(cell) for cell in path ])
+
+    return encoded
+
+def decodePaths(encoded, rows):
+    """
+    unpack paths packed by encodePaths()
+
+    @param  encoded :   'array' of path lengths and cell indices
+    @param  rows    :   number of rows in the grid the paths were generated for
+
+    @return         :   list of paths of (col, row) pairs
+    """
+
+    paths, position = [], 0
+
+    while position < len(encoded):
+        length = encoded[position]
+        paths.append([ divmod(index, rows) for index in encoded[position + 1 : position + 1 + length] ])
+        position += length + 1
+
+    return paths
+
+def initGenerateWorker(rows, cols):
+    """
+    create the grid reused by every task a generateMany() worker process runs
+
+    @param  rows    :   number of rows in the generated grids
+    @param  cols    :   number of columns in the generated grids
+    """
+
+    global worker_grid
+
+    # the grid is never drawn, so graphics-related sizing doesn't matter here
+    worker_grid = Grid([0, 0], 0, 0, rows, cols)
+
+def runGenerateTask(task_seed):
+    """
+    generate one set of flows on this worker's grid (see generateMany())
+
+    @param  task_seed   :   seed for the random choices made for this set of flows
+
+    @return             :   the generated paths, packed by encodePaths()
+    """
+
+    worker_grid.clearValues()
+
+    paths = generateFlows(worker_grid, seed=task_seed)
+
+    return encodePaths(worker_grid, paths)
+
+def generateMany(rows, cols, n, workers=None, first_seed=None):
+    """
+    generate many sets of flows for grids of the same size, spread over a pool of worker
+    processes; task i is seeded with first_seed + i, so any result can be reproduced on its own
+    with generateFlows(grid, seed=first_seed + i), and batches can be split up by seed range
+
+    @param      rows        :   number of rows in the generated grids
+    @param      cols        :   number of columns in the generated grids
+    @param      n           :   number of sets of flows to generate
+    @optional   workers     :   number of worker processes (defaults to the number of CPUs;
+                                with 1 worker everything runs in this process)
+    @optional   first_seed  :   seed of the first task (chosen randomly if not given)
+
+    @return                 :   list of the n sets of paths, in seed order, each packed by
+                                encodePaths() (use decodePaths() to unpack them); a set
+                                filled its grid if its path lengths sum to rows * cols
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    if first_seed is None:
+        first_seed = floor(random() * 2 ** 32)
+
+    seeds = range(first_seed, first_seed + n)
 
+    if workers == 1:
+        initGenerateWorker(rows, cols)
+        return [ runGenerateTask(task_seed) for task_seed in seeds ]
+
+    # hand out the tasks in chunks so the workers don't go back to the pool for every grid
+    chunk_size = max(1, n // (4 * workers))
+
+    with Pool(workers, initializer=initGenerateWorker, initargs=(rows, cols)) as pool:
+        return pool.map(runGenerateTask, seeds, chunksize=chunk_size)
+
+def iterFlows(rows, cols, first_seed=None, count=None, prefetch=0, workers=1):
+    """
+    lazily generate sets of flows for grids of the same size, one at a time; set i is seeded
+    with first_seed + i (as in generateMany())
+
+    without prefetching, each set is generated in this process when it is asked for, reusing
+    one grid; with prefetching, worker processes generate sets in the background, but at most
+    'prefetch' sets are ever waiting or in progress, so memory use stays bounded
+
+    @param      rows        :   number of rows in the generated grids
+    @param      cols        :   number of columns in the generated grids
+    @optional   first_seed  :   seed of the first set of flows (chosen randomly if not given)
+    @optional   count       :   number of sets of flows to generate (endless if not given)
+    @optional   prefetch    :   maximum number of sets generated ahead of the consumer (0 to
+                                generate each set only when it is asked for)
+    @optional   workers     :   number of worker processes used when prefetching
+
+    @return                 :   generator of lists of paths, like those returned by generateFlows()
+    """
+
+    if first_seed is None:
+        first_seed = floor(random() * 2 ** 32)
+
+    if count is None:
+        seeds = itertools.count(first_seed)
+    else:
+        seeds = iter(range(first_seed, first_seed + count))
+
+    if prefetch == 0:
+        # the grid is never drawn, so graphics-related sizing doesn't matter here
+        grid = Grid([0, 0], 0, 0, rows, cols)
+
+        for task_seed in seeds:
+            grid.clearValues()
+
+            yield generateFlows(grid, seed=task_seed)
+
+        return
+
+    with Pool(workers, initializer=initGenerateWorker, initargs=(rows, cols)) as pool:
+        # queue of the results of the sets being generated, in seed order
+        pending = deque()
+
+        for task_seed in itertools.islice(seeds, prefetch):
+            pending.append(pool.apply_async(runGenerateTask, (task_seed,)))
+
+        while len(pending) > 0:
+            encoded = pending.popleft().get()
+
+            # start the next set before handing this one over, keeping the workers busy
+            for task_seed in itertools.islice(seeds, 1):
+                pending.append(pool.apply_async(runGenerateTask, (task_seed,)))
+
+            yield decodePaths(encoded, rows)
+
+def getTileBounds(length, tile_length):
+    """
+    split a row or column of cells into tiles (see generateTiled()); a leftover too short to be
+    filled on its own is added to the last tile
+
+    @param  length      :   number of cells to split
+    @param  tile_length :   number of cells in each tile
+
+    @return             :   list of (first cell, number of cells) pairs of the tiles, in order
     """
-    # DEBUG
-    if len(grid.unoccupied) == 0:
-        num_gdmp = len(gdmp_calls)
-        num_gec = len(gec_calls)
 
-        av_gdmp = sum(gdmp_calls) / num_gdmp
-        av_gec = sum(gec_calls) / num_gec
+    bounds = [ (start, min(tile_length, length - start)) for start in range(0, length, tile_length) ]
+
+    if len(bounds) > 1 and bounds[-1][1] < MIN_TILE_LENGTH:
+        start, leftover = bounds.pop()
+        bounds[-1] = (bounds[-1][0], bounds[-1][1] + leftover)
 
-        print(str(num_gdmp) + " gdmp calls; average = " + str(av_gdmp))
-        print(str(num_gec) + " gec calls; average = " + str(av_gec))
+    return bounds
+
+def runTileTask(task):
     """
+    fill one tile of a tiled grid with flows, on a grid of its own (see generateTiled())
 
-    return final_paths
+    @param  task    :   4-tuple of the tile's number of rows and columns, the seed for its random
+                        choices and the generation engine to use
 
-def randomStep(grid, path, last_direction=None, flow_index=None):
+    @return         :   the generated paths, packed by encodePaths() in the tile's coordinates
     """
-    add a cell to the path adjacent to its last cell (one step in a random walk)
 
-    @param      grid            :   grid the path is contained in
-    @param      path            :   ordered list of cells in the path
-    @optional   last_direction  :   last direction the walk traveled in
-    @optional   flow_index      :   index of flow the path is being made for
+    rows, cols, tile_seed, engine = task
+
+    # the grid is never drawn, so graphics-related sizing doesn't matter here
+    grid = Grid([0, 0], 0, 0, rows, cols)
 
-    @return                     :   2-tuple of path with added cell and the
-                                    direction traveled in (or the original path
-                                    and None if no cell could be added)
+    paths = generateFlows(grid, seed=tile_seed, engine=engine)
+
+    return encodePaths(grid, paths)
+
+def generateTiled(grid, tile_size=DEFAULT_TILE_SIZE, seed=None, workers=None, engine=SEARCH_ENGINE):
     """
+    fill a large grid by splitting it into square tiles, generating flows for each tile with
+    generateFlows() in a pool of worker processes, and stitching the tiles' flows together
+    across their seams with combinePaths(); each tile is seeded from the given seed, so the
+    result doesn't depend on the number of workers
+
+    @param      grid        :   empty grid the flows will be placed on (a ValueError is raised otherwise)
+    @optional   tile_size   :   number of rows and columns in each tile, at least MIN_TILE_LENGTH (a
+                                ValueError is raised otherwise; tiles along the top and right edges of
+                                the grid may be up to MIN_TILE_LENGTH - 1 cells larger or any amount
+                                smaller)
+    @optional   seed        :   random.Random instance or seed to draw random choices from (see getRandom())
+    @optional   workers     :   number of worker processes (defaults to the number of CPUs; with
+                                1 worker everything runs in this process)
+    @optional   engine      :   engine generating each tile's flows (see generateFlows())
+
+    @return                 :   list of paths of (col, row) pairs in the grid's coordinates; each
+                                path's cells are assigned its index in the list in the grid (the
+                                grid is filled if every tile was)
+    """
+
+    # tiles narrower than the shortest flow can never be filled, and the tiles' flows are placed
+    # over whatever the grid holds; check before any tile is generated
+    if tile_size < MIN_TILE_LENGTH:
+        raise ValueError("Tiles must be at least " + str(MIN_TILE_LENGTH) + " cells wide, not " + str(tile_size))
 
-    # randomize which direction the next step is in from the last cell in the path
-    step_directions = list(direction.directions)
-    if not last_direction == None:
-        del step_directions[(last_direction + 2) % 4]
-    shuffle(step_directions)
+    if not grid.emptyCount == grid.size:
+        raise ValueError("Tiled generation only fills empty grids")
 
-    # choose a cell in a direction that meets requirements
-    for dir in step_directions:
-        next_cell = direction.next[dir](*path[-1])
+    if not engine in ENGINES:
+        raise ValueError("Unknown generation engine " + repr(engine))
 
-        # the next cell needs to:
-        # 1) be in the grid
-        # 2) unoccupied
-        # 3) if flow is given, have a flow degree < 2
+    rng = getRandom(seed)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tiles = list(itertools.product(getTileBounds(grid.cols, tile_size), getTileBounds(grid.rows, tile_size)))
+    tasks = [ (tile_rows, tile_cols, rng.getrandbits(32), engine) for (col, tile_cols), (row, tile_rows) in tiles ]
+
+    if workers == 1:
+        results = [ runTileTask(task) for task in tasks ]
+    else:
+        with Pool(workers) as pool:
+            results = pool.map(runTileTask, tasks)
 
-        if grid.inBounds(next_cell) and grid.isEmpty(next_cell):
-            if flow_index == None or grid.valueDegree(next_cell, flow_index) < 2:
-                return ( path + [ next_cell ], dir )
+    # move every tile's paths into the grid's coordinates
+    paths = []
+    for ((col, tile_cols), (row, tile_rows)), encoded in zip(tiles, results):
+        for path in decodePaths(encoded, tile_rows):
+            paths.append([ (col + tile_col, row + tile_row) for tile_col, tile_row in path ])
 
-    # if we reach here, no cell could be added to the path
-    return ( path, None )
+    # stitch flows that end next to each other, across seams (and within tiles)
+    return combinePaths(grid, paths, seed=rng)
@@ -1,6 +1,8 @@
-import pyglet
 from math import radians, sin, cos, sqrt
 
+# NOTE: pyglet is only imported by the functions that build vertex lists, so modules using
+# this one can be imported (and used headless) without pyglet
+
 def generateCircle(center, radius, num_points, color=(255, 255, 255), fill=False, batch=None):
     """
     generate the vertex list needed to draw and color a circle
@@ -17,6 +19,8 @@ def generateCircle(center, radius, num_points, color=(255, 255, 255), fill=False
     @return                 :   'vertex_list' object used to draw generated circle
     """
 
+    import pyglet
+
     # initialize the list of vertex coordinates with the top of the circle
     vertices = [ center[0], center[1] + radius ]
 
@@ -133,6 +137,8 @@ def generateRectangle(origin, width, height, color=(255, 255, 255), fill=False,
     @return             :   'vertex_list' object used to draw generated rectangle
     """
 
+    import pyglet
+
     # calculate the corner vertices' coordinates for the rectangle (in counter-clockwise
     # order, starting with the bottom left corner)
     vertices = [    origin[0], origin[1],
@@ -185,6 +191,8 @@ def generateLine(p1, p2, color=(255, 255, 255), width=1.0, batch=None):
     @return             :   'vertex_list' object used to draw generated line
     """
 
+    import pyglet
+
     # lines of thickness <= 1.0 are just treated as regular GL_LINES of width 1.0 pixels
     if width <= 1.0:
         # if no batch is specified, just return the vertex list for the line (needs to be
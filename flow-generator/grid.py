@@ -1,7 +1,52 @@
-import pyglet
 import graphics
 import direction
 import itertools
+from collections.abc import Mapping, Set
+
+# table turning the occupancy flags of a grid into the digits of a binary number (see Grid.emptyBits)
+BIT_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+
+class CellValues(Mapping):
+    """
+    read-only (col, row) view of the values assigned to a grid's cells
+
+    required attributes:
+    --------------------
+    @attribute  grid    :   grid whose cell values are viewed
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __getitem__(self, cell):
+        return self.grid.cellValues[self.grid.getIndex(cell)]
+
+    def __iter__(self):
+        return iter(self.grid.cells)
+
+    def __len__(self):
+        return self.grid.size
+
+class EmptyCells(Set):
+    """
+    read-only (col, row) view of the unoccupied cells in a grid
+
+    required attributes:
+    --------------------
+    @attribute  grid    :   grid whose unoccupied cells are viewed
+    """
+
+    def __init__(self, grid):
+        self.grid = grid
+
+    def __contains__(self, cell):
+        return self.grid.isEmpty(cell)
+
+    def __iter__(self):
+        return itertools.compress(self.grid.cells, self.grid.free)
+
+    def __len__(self):
+        return self.grid.emptyCount
 
 class Grid:
     """
@@ -26,12 +71,101 @@ class Grid:
     internal attributes:
     -------------------
     @attribute  batch       :   batch of all lines generated to create grid
+                                (None until the grid is first drawn)
     @attribute  labelBatch  :   batch of all labels generated for the grid
-                                (None if the grid is unlabelled)
+                                (None until the grid is first drawn, or if the grid is unlabelled)
     @attribute  values      :   optional mapping of grid cells to some set of values
     @attribute  unoccupied  :   set of cells unmapped to any value
+
+    integer-indexed attributes:
+    ---------------------------
+    cells are also addressed by a flat index, col * rows + row (the order of
+    getAllCellCoordinates()); 'values' and 'unoccupied' are views over these
+
+    @attribute  size        :   total number of cells in the grid
+    @attribute  cells       :   list mapping each index to its (col, row) tuple
+    @attribute  neighbors   :   list mapping each index to a tuple of the indices
+                                of its in-bounds neighbors
+    @attribute  free        :   bytearray holding 1 for each unoccupied index and 0
+                                for each occupied one
+    @attribute  cellValues  :   list of the value assigned to each index (None if unassigned)
+    @attribute  emptyCount  :   number of unoccupied cells
+    @attribute  degrees     :   bytearray holding the number of unoccupied neighbors of each
+                                index, kept up to date by setAt() and resetAt()
+    @attribute  epoch       :   number of times the grid has been cleared; 'free', 'cellValues'
+                                and 'degrees' are brought up to date with it when next used, so
+                                clearing the grid is O(1)
+    @attribute  storedEpoch :   epoch the stored cell state was last brought up to date with
+    @attribute  emptyDegrees:   bytes holding the degree of each index in an empty grid
+    @attribute  emptyBuckets:   tuple of the buckets (see below) of an empty grid, as tuples
+    @attribute  emptyPositions: tuple of the positions (see below) of an empty grid
+    @attribute  buckets     :   list holding, for each possible degree, a list of the unoccupied
+                                indices with that degree (in no particular order), kept up to
+                                date by setAt() and resetAt()
+    @attribute  positions   :   list giving the position of each unoccupied index in its bucket
+    @attribute  emptyBits   :   integer with bit i set for each unoccupied index i (a bitboard, see
+                                bitboard.py), built from 'free' when first used after a change
+    @attribute  trail       :   list of (index, old value, old occupancy flag) for every change
+                                since the first open checkpoint (None if no checkpoint is open)
+    @attribute  checkpoints :   list of the trail position of each open checkpoint, from the outermost
+                                to the innermost (a checkpoint is its depth in this list, since nested
+                                checkpoints can share a trail position)
     """
 
+    # cache of (cells, neighbors, degrees, buckets, positions) tables for each (rows, cols) shape,
+    # shared by all grids
+    shapes = {}
+
+    @staticmethod
+    def getShape(rows, cols):
+        """
+        get the coordinate, neighbor, degree and degree bucket tables for grids with the given
+        shape, building them only the first time a shape is requested
+
+        @param rows             :   number of rows in the grid
+        @param cols             :   number of columns in the grid
+
+        @return                 :   5-tuple of the list mapping indices to (col, row) tuples,
+                                    the list mapping indices to tuples of neighbor indices, the
+                                    bytes holding the degree of each index in an empty grid, the
+                                    tuple of the indices of each degree in an empty grid (in
+                                    ascending order) and the tuple of each index's position among
+                                    the indices of its degree
+        """
+
+        shape = (rows, cols)
+
+        if not shape in Grid.shapes:
+            cells = list(itertools.product(range(cols), range(rows)))
+
+            neighbors = []
+            for cell in cells:
+                adjacent = []
+
+                for dir in direction.directions:
+                    next_col, next_row = direction.next[dir](*cell)
+
+                    if 0 <= next_col < cols and 0 <= next_row < rows:
+                        adjacent.append(next_col * rows + next_row)
+
+                neighbors.append(tuple(adjacent))
+
+            degrees = bytes(len(adjacent) for adjacent in neighbors)
+
+            # sort every cell of an empty grid into the bucket of its degree
+            buckets = [ [] for degree in range(len(direction.directions) + 1) ]
+            positions = []
+
+            for index, degree in enumerate(degrees):
+                positions.append(len(buckets[degree]))
+                buckets[degree].append(index)
+
+            buckets = tuple(tuple(bucket) for bucket in buckets)
+
+            Grid.shapes[shape] = (cells, neighbors, degrees, buckets, tuple(positions))
+
+        return Grid.shapes[shape]
+
     @staticmethod
     def generateGrid(origin, width, height, rows, cols, color=(255, 255, 255), thickness=1.0):
         """
@@ -48,6 +182,8 @@ class Grid:
         @return                 :   'vertex_list' object used to draw generated grid
         """
 
+        import pyglet
+
         # create the batch of vertex lists used to draw the grid
         grid = pyglet.graphics.Batch()
 
@@ -95,22 +231,166 @@ class Grid:
         self.color = color
         self.thickness = thickness
 
-        # get the batch of the grid for drawing
-        self.batch = Grid.generateGrid(self.origin, self.width, self.height, self.rows, self.cols, color=self.color, thickness=self.thickness)
+        # the batches of the grid's lines and labels are only generated when the grid is first
+        # drawn, so grids used without drawing them (e.g. for flow generation) never need pyglet
+        self.batch = None
+        self.labelBatch = None
 
-        # get the batch of grid labels, if requested (otherwise labelBatch is None)
         self.label = label
         self.alpha = alpha
         self.labelColor = labelColor
-        self.labelBatch = self.generateLabels(self.labelColor)
 
-        # initialize the cell-value mapping (all un-assigned by being set to None)
-        self.values = { cell : None for cell in self.getAllCellCoordinates() }
+        # look up the index tables shared by every grid of this shape
+        self.size = self.rows * self.cols
+        self.cells, self.neighbors, self.emptyDegrees, self.emptyBuckets, self.emptyPositions = Grid.getShape(self.rows, self.cols)
+
+        # initialize the cell-value storage (all un-assigned by being set to None), the
+        # occupancy flags (all cells start out unoccupied) and the degree counts
+        self.storedValues = [ None ] * self.size
+        self.storedFree = bytearray(b'\x01') * self.size
+        self.storedDegrees = bytearray(self.emptyDegrees)
+        self.emptyCount = self.size
+        self.storedBits = None
+
+        # sort the (all unoccupied) cells into buckets by their degree
+        self.storedBuckets = [ list(bucket) for bucket in self.emptyBuckets ]
+        self.storedPositions = list(self.emptyPositions)
+
+        self.epoch = 0
+        self.storedEpoch = 0
+
+        # changes are only recorded while a checkpoint is open
+        self.trail = None
+        self.checkpoints = []
+
+        # (col, row) views of the cell values and the unoccupied cells
+        self.values = CellValues(self)
+        self.unoccupied = EmptyCells(self)
+
+    def refresh(self):
+        """
+        bring the stored cell state up to date with the grid's epoch, resetting every cell if
+        the grid has been cleared since it was last used (the storage is reset in place, with
+        bulk copies)
+
+        """
+
+        if not self.storedEpoch == self.epoch:
+            self.storedValues[:] = [ None ] * self.size
+            self.storedFree[:] = b'\x01' * self.size
+            self.storedDegrees[:] = self.emptyDegrees
+            self.fillBuckets()
+            self.storedBits = None
+
+            self.storedEpoch = self.epoch
+
+    def fillBuckets(self):
+        """
+        sort every cell of an empty grid into the bucket of its degree, by copying the buckets
+        shared by every empty grid of this shape (see getShape()) in place
+
+        """
+
+        for bucket, empty in zip(self.storedBuckets, self.emptyBuckets):
+            bucket[:] = empty
+
+        self.storedPositions[:] = self.emptyPositions
+
+    def addToBucket(self, index, degree):
+        """
+        add an unoccupied index to the bucket of the given degree in O(1)
+
+        @param  index   :   index of the cell
+        @param  degree  :   current degree of the cell
+        """
+
+        bucket = self.storedBuckets[degree]
+
+        self.storedPositions[index] = len(bucket)
+        bucket.append(index)
+
+    def removeFromBucket(self, index, degree):
+        """
+        remove an index from the bucket of the given degree in O(1), by moving the last index
+        of the bucket into its place
+
+        @param  index   :   index of the cell
+        @param  degree  :   current degree of the cell
+        """
+
+        bucket, positions = self.storedBuckets[degree], self.storedPositions
+
+        last = bucket.pop()
+
+        if not last == index:
+            bucket[positions[index]] = last
+            positions[last] = positions[index]
+
+    @property
+    def free(self):
+        if not self.storedEpoch == self.epoch:
+            self.refresh()
+
+        return self.storedFree
+
+    @property
+    def cellValues(self):
+        if not self.storedEpoch == self.epoch:
+            self.refresh()
+
+        return self.storedValues
+
+    @property
+    def degrees(self):
+        if not self.storedEpoch == self.epoch:
+            self.refresh()
+
+        return self.storedDegrees
+
+    @property
+    def emptyBits(self):
+        free = self.free
+
+        if self.storedBits is None:
+            # the flag of index 0 has to be the lowest bit, i.e. the last digit
+            self.storedBits = int(b'0' + free[::-1].translate(BIT_DIGITS), 2)
+
+        return self.storedBits
+
+    @property
+    def buckets(self):
+        if not self.storedEpoch == self.epoch:
+            self.refresh()
+
+        return self.storedBuckets
+
+    def getIndex(self, cell):
+        """
+        get the flat index of a cell, checking that it lies within the grid (a cell outside the
+        grid would otherwise map onto another cell's index, e.g. (0, rows) onto (1, 0))
+
+        @param  cell    :   2-tuple of 0-indexed (column, row) pair
+
+        @return         :   index of the cell (raises a KeyError if the cell is out of bounds)
+        """
+
+        col, row = cell
+
+        if not (0 <= col < self.cols and 0 <= row < self.rows):
+            raise KeyError(cell)
 
-        # create a set (hashtable) to store unoccupied cells in the grid; since all
-        # elements of a set are unique (and thus hashable), we have O(1) element
-        # removal, insertion, and check of whether a cell is unoccupied on average
-        self.unoccupied = set( self.getAllCellCoordinates() )
+        return col * self.rows + row
+
+    def getCell(self, index):
+        """
+        get the (col, row) pair of a flat index
+
+        @param  index   :   index of the cell
+
+        @return         :   2-tuple of 0-indexed (column, row) pair
+        """
+
+        return self.cells[index]
 
     def isEmpty(self, cell):
         """
@@ -121,7 +401,18 @@ class Grid:
         @return         :   boolean of whether cell has been assigned
         """
 
-        return cell in self.unoccupied
+        return self.inBounds(cell) and self.free[cell[0] * self.rows + cell[1]] == 1
+
+    def isEmptyAt(self, index):
+        """
+        determine if the cell at this index has been assigned a value or not
+
+        @param  index   :   index of the cell
+
+        @return         :   boolean of whether cell has been assigned
+        """
+
+        return self.free[index] == 1
 
     def inBounds(self, cell):
         """
@@ -148,12 +439,23 @@ class Grid:
         @return         :   number of adjacent cells assigned the given value
         """
 
-        valueDeg = 0
+        return self.valueDegreeAt(self.getIndex(cell), value)
+
+    def valueDegreeAt(self, index, value):
+        """
+        find number of cells assigned the given value the cell at this index is adjacent with
 
-        for dir in direction.directions:
-            next_cell = direction.next[dir](*cell)
+        @param  index   :   index of the cell
+        @param  value   :   value we're looking for
 
-            if self.inBounds(next_cell) and self.values[next_cell] == value:
+        @return         :   number of adjacent cells assigned the given value
+        """
+
+        valueDeg = 0
+        cellValues = self.cellValues
+
+        for neighbor in self.neighbors[index]:
+            if cellValues[neighbor] == value:
                 valueDeg = valueDeg + 1
 
         return valueDeg
@@ -184,15 +486,44 @@ class Grid:
         @return         :   number of adjacent unassigned cells
         """
 
-        deg = 0
+        return self.degreeAt(self.getIndex(cell))
+
+    def degreeAt(self, index):
+        """
+        find total number of unassigned cells the cell at this index is adjacent with
+
+        @param  index   :   index of the cell
+
+        @return         :   number of adjacent unassigned cells
+        """
+
+        return self.degrees[index]
 
-        for dir in direction.directions:
-            next_cell = direction.next[dir](*cell)
+    def getLowestDegree(self):
+        """
+        find the lowest degree of any unassigned cell in O(1), using the degree buckets
+
+        @return :   lowest degree of an unassigned cell (None if every cell is assigned)
+        """
 
-            if self.inBounds(next_cell) and self.isEmpty(next_cell):
-                deg = deg + 1
+        for degree, bucket in enumerate(self.buckets):
+            if len(bucket) > 0:
+                return degree
+
+        return None
+
+    def getDegreeBucket(self, degree):
+        """
+        get the indices of all unassigned cells with the given degree (the list is kept up to
+        date by the grid, so it must not be changed and is only valid until the grid changes)
 
-        return deg
+        @param  degree  :   number of adjacent unassigned cells
+
+        @return         :   list of the indices of the unassigned cells with that degree, in no
+                            particular order
+        """
+
+        return self.buckets[degree]
 
     def getAllCellCoordinates(self):
         """
@@ -203,6 +534,15 @@ class Grid:
 
         return list(itertools.product(range(self.cols), range(self.rows)))
 
+    def getEmptyIndices(self):
+        """
+        get a list of the indices of all unoccupied cells in the grid
+
+        @return :   list of unoccupied cell indices, in ascending order
+        """
+
+        return list(itertools.compress(range(self.size), self.free))
+
     def setCell(self, cell, value):
         """
         set a value to the given cell in the grid
@@ -211,8 +551,39 @@ class Grid:
         @param  value   :   object to assign to cell
         """
 
-        self.values[cell] = value
-        self.unoccupied.remove(cell)
+        self.setAt(self.getIndex(cell), value)
+
+    def setAt(self, index, value):
+        """
+        set a value to the cell at the given index
+
+        @param  index   :   index of the cell
+        @param  value   :   object to assign to cell
+        """
+
+        cellValues, free = self.cellValues, self.free
+
+        if not self.trail is None:
+            self.trail.append((index, cellValues[index], free[index]))
+
+        cellValues[index] = value
+
+        if free[index] == 1:
+            free[index] = 0
+            self.emptyCount -= 1
+            self.storedBits = None
+
+            degrees = self.storedDegrees
+            self.removeFromBucket(index, degrees[index])
+
+            # this cell no longer counts towards its neighbors' degrees (unoccupied neighbors
+            # move down a bucket)
+            for neighbor in self.neighbors[index]:
+                if free[neighbor] == 1:
+                    self.removeFromBucket(neighbor, degrees[neighbor])
+                    self.addToBucket(neighbor, degrees[neighbor] - 1)
+
+                degrees[neighbor] -= 1
 
     def resetCell(self, cell):
         """
@@ -221,17 +592,107 @@ class Grid:
         @param  cell    :   2-tuple of 0-indexed (column, row) pair
         """
 
-        self.values[cell] = None
-        self.unoccupied.add(cell)
+        self.resetAt(self.getIndex(cell))
+
+    def resetAt(self, index):
+        """
+        reset the value of the cell at the given index
+
+        @param  index   :   index of the cell
+        """
+
+        cellValues, free = self.cellValues, self.free
+
+        if not self.trail is None:
+            self.trail.append((index, cellValues[index], free[index]))
+
+        cellValues[index] = None
+
+        if free[index] == 0:
+            free[index] = 1
+            self.emptyCount += 1
+            self.storedBits = None
+
+            degrees = self.storedDegrees
+            self.addToBucket(index, degrees[index])
+
+            # this cell counts towards its neighbors' degrees again (unoccupied neighbors move
+            # up a bucket)
+            for neighbor in self.neighbors[index]:
+                if free[neighbor] == 1:
+                    self.removeFromBucket(neighbor, degrees[neighbor])
+                    self.addToBucket(neighbor, degrees[neighbor] + 1)
+
+                degrees[neighbor] += 1
+
+    def checkpoint(self):
+        """
+        start recording changes to the grid's cells so they can be undone with rollback();
+        checkpoints can be nested
+
+        @return :   checkpoint to pass to rollback() or commit()
+        """
+
+        if self.trail is None:
+            self.trail = []
+
+        self.checkpoints.append(len(self.trail))
+
+        return len(self.checkpoints) - 1
+
+    def rollback(self, checkpoint):
+        """
+        undo every change made to the grid's cells since the checkpoint was taken, in time
+        proportional to the number of changes (derived state, like degrees, is undone too);
+        the checkpoint stays open
+
+        @param  checkpoint  :   checkpoint returned by checkpoint()
+        """
+
+        position = self.checkpoints[checkpoint]
+
+        # undoing a change is itself a change, which must not be recorded
+        trail, self.trail = self.trail, None
+
+        while len(trail) > position:
+            index, value, was_free = trail.pop()
+
+            # unoccupied cells never hold a value
+            if was_free == 1:
+                self.resetAt(index)
+            else:
+                self.setAt(index, value)
+
+        self.trail = trail
+
+        # checkpoints taken after this one no longer exist
+        del self.checkpoints[checkpoint + 1:]
+
+    def commit(self, checkpoint):
+        """
+        keep the changes made since the checkpoint was taken and close it, along with any
+        checkpoints taken after it; changes are no longer recorded once the outermost
+        checkpoint is committed
+
+        @param  checkpoint  :   checkpoint returned by checkpoint()
+        """
+
+        del self.checkpoints[checkpoint:]
+
+        if len(self.checkpoints) == 0:
+            self.trail = None
 
     def clearValues(self):
         """
-        reset the values attribute of this graph
+        reset the values attribute of this graph (this also closes any open checkpoints); this
+        is O(1), since the cells are only reset when the grid is next used (see refresh())
 
         """
 
-        for cell in self.getAllCellCoordinates():
-            self.resetCell(cell)
+        self.epoch += 1
+        self.emptyCount = self.size
+        self.trail = None
+        self.checkpoints = []
 
     def draw(self):
         """
@@ -239,6 +700,12 @@ class Grid:
 
         """
 
+        # get the batch of the grid for drawing, and the batch of grid labels, if requested
+        # (otherwise labelBatch stays None)
+        if self.batch is None:
+            self.batch = Grid.generateGrid(self.origin, self.width, self.height, self.rows, self.cols, color=self.color, thickness=self.thickness)
+            self.labelBatch = self.generateLabels(self.labelColor)
+
         self.batch.draw()
 
         # draw the grid's labels, if it has any
@@ -282,6 +749,8 @@ class Grid:
         if self.label is False:
             return None
 
+        import pyglet
+
         labelBatch = pyglet.graphics.Batch()
 
         # positioning for column/row labels
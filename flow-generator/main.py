@@ -31,6 +31,13 @@ except IndexError:
     else:
         cols = rows
 
+# an optional third argument seeds the flow generation so a puzzle can be reproduced
+try:
+    flow_seed = int(sys.argv[3])
+
+except (ValueError, IndexError):
+    flow_seed = None
+
 # create the window and the grid
 window = pyglet.window.Window(WINDOW_WIDTH, WINDOW_HEIGHT)
 grid = Grid(    GRID_ORIGIN,
@@ -41,7 +48,7 @@ grid = Grid(    GRID_ORIGIN,
                 (179, 179, 179),
                 thickness = 5.0,    )
 
-paths = generator.generateFlows(grid)
+paths = generator.generateFlows(grid, seed=flow_seed)
 
 # make sure all cells in the list of paths are unique
 flatten = lambda multi : [x for arr in multi for x in arr]
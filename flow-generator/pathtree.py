@@ -0,0 +1,88 @@
+class PathTree:
+    """
+    class to represent the shortest paths from a source cell to every cell it can reach
+    (cells are flat indices, see Grid); paths are only built when asked for
+
+    required attributes:
+    --------------------
+    @attribute  source  :   index of the source cell of the paths
+    @attribute  parents :   list giving the parent index of each cell index in its path (None
+                            if the cell is the source or unreachable)
+    @attribute  depths  :   list giving the number of steps from the source to each cell index
+                            (None if the cell is unreachable)
+    @attribute  order   :   list of the reachable cell indices in the order they were added to
+                            the tree, starting with the source (parents come before children)
+    """
+
+    def __init__(self, source, parents, depths, order):
+        """
+        constructor for the PathTree class
+
+        See class docstring for parameters
+        """
+
+        self.source = source
+        self.parents = parents
+        self.depths = depths
+        self.order = order
+
+    def reaches(self, cell):
+        """
+        determine whether the source has a path to this cell
+
+        @param  cell    :   index of the cell
+
+        @return         :   True if the cell is in the tree; False otherwise
+        """
+
+        return not self.depths[cell] is None
+
+    def getSize(self):
+        """
+        get the number of cells in the tree (the size of the source's component block)
+
+        @return :   number of reachable cells, including the source
+        """
+
+        return len(self.order)
+
+    def getLength(self, sink):
+        """
+        get the number of cells in the path from the source to this cell in O(1)
+
+        @param  sink    :   index of a reachable cell
+
+        @return         :   number of cells in the path, including the source and the sink
+        """
+
+        return self.depths[sink] + 1
+
+    def iterPath(self, sink):
+        """
+        lazily walk the path from this cell back to the source
+
+        @param  sink    :   index of a reachable cell
+
+        @return         :   generator of the path's cell indices, from the sink to the source
+        """
+
+        assert self.reaches(sink), "No path to cell " + str(sink)
+
+        cell = sink
+        while not cell is None:
+            yield cell
+            cell = self.parents[cell]
+
+    def getPath(self, sink):
+        """
+        build the path from the source to this cell
+
+        @param  sink    :   index of a reachable cell
+
+        @return         :   list of the path's cell indices, from the source to the sink
+        """
+
+        path = list(self.iterPath(sink))
+        path.reverse()
+
+        return path
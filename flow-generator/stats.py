@@ -0,0 +1,178 @@
+from time import perf_counter
+
+class Stats:
+    """
+    class to record what flow generation spends its time on; pass one to generateFlows() to have it
+    filled in (generation without one only pays for a check of whether it was given one)
+
+    generation reports what it does through the add...() methods, which subclasses can extend to
+    record more than counts (see tracing.Trace)
+
+    the counts add up over every generation the same instance is passed to, so a single instance can
+    collect the totals of many boards (e.g. every board of one size)
+
+    internal attributes:
+    --------------------
+    @attribute  calls           :   dictionary of the number of calls to each timed part of generation (see PARTS)
+    @attribute  seconds         :   dictionary of the total perf_counter() time spent in each timed part of generation
+    @attribute  sinksRejected   :   dictionary of the number of sinks rejected by each rule (see RULES)
+    @attribute  generations     :   number of generations recorded
+    @attribute  sourcesTried    :   number of source cells flows were started from (each costs a budget step)
+    @attribute  sourcesFailed   :   number of source cells the path search found no legal path from
+    @attribute  walksPlaced     :   number of flows placed by random walks
+    @attribute  searchesPlaced  :   number of flows placed by the path search
+    @attribute  restartsUsed    :   number of times generation started over
+    """
+
+    # parts of flow generation that are timed (see addCall())
+    SEARCH = "search"               # degree-minimized shortest path search (getDegreeMinimizedPathTree())
+    VALIDATION = "validation"       # checking which sinks' paths are legal (getLegalSinkIndices(), including its component check)
+    COMPONENTS = "components"       # finding the sizes of the components of unoccupied cells (getEmptyComponentSizes())
+    WALK = "walk"                   # random walks, including their component checks (walkFlow())
+
+    # rules a sink's path can be rejected by (see getLegalSinkIndices())
+    SHORT = "short"                 # the path is fewer than 3 cells long
+    BLOCK = "block"                 # the path leaves an illegal number of cells in the source's component
+    COMPONENT = "component"         # the path splits off (or leaves elsewhere) a component of illegal size
+
+    PARTS = [ SEARCH, VALIDATION, COMPONENTS, WALK ]
+    RULES = [ SHORT, BLOCK, COMPONENT ]
+
+    def __init__(self):
+        """
+        constructor for the Stats class
+
+        """
+
+        self.reset()
+
+    def reset(self):
+        """
+        clear everything recorded so far
+
+        """
+
+        self.calls = { part : 0 for part in Stats.PARTS }
+        self.seconds = { part : 0.0 for part in Stats.PARTS }
+        self.sinksRejected = { rule : 0 for rule in Stats.RULES }
+
+        self.generations = 0
+        self.sourcesTried = 0
+        self.sourcesFailed = 0
+        self.walksPlaced = 0
+        self.searchesPlaced = 0
+        self.restartsUsed = 0
+
+    def startGeneration(self, grid, engine):
+        """
+        record the start of a generation
+
+        @param  grid    :   grid the flows will be placed on
+        @param  engine  :   engine placing the flows (see generator.generateFlows())
+        """
+
+        self.generations += 1
+
+    def endGeneration(self, grid, budget):
+        """
+        record the end of a generation
+
+        @param  grid    :   grid the flows were placed on
+        @param  budget  :   Budget the generation used
+        """
+
+        pass
+
+    def addSource(self, grid, source, flow_index):
+        """
+        record a source cell a flow is started from
+
+        @param  grid        :   grid containing the cell
+        @param  source      :   index of the source cell
+        @param  flow_index  :   index the flow will have if it's placed
+        """
+
+        self.sourcesTried += 1
+
+    def addRejection(self, sink, rule):
+        """
+        record a sink whose path from the current source was rejected
+
+        @param  sink    :   index of the sink cell
+        @param  rule    :   rule the path broke (one of RULES)
+        """
+
+        self.sinksRejected[rule] += 1
+
+    def addFailure(self, source):
+        """
+        record a source cell the path search found no legal path from
+
+        @param  source  :   index of the source cell
+        """
+
+        self.sourcesFailed += 1
+
+    def addPlacement(self, path, flow_index, walked):
+        """
+        record a flow placed in the grid
+
+        @param  path        :   list of the flow's cell indices
+        @param  flow_index  :   index of the flow
+        @param  walked      :   True if the flow was placed by a random walk; False if by the path search
+        """
+
+        if walked:
+            self.walksPlaced += 1
+        else:
+            self.searchesPlaced += 1
+
+    def addRestart(self):
+        """
+        record generation starting over
+
+        """
+
+        self.restartsUsed += 1
+
+    def addCall(self, part, start_time):
+        """
+        record a call to a timed part of generation
+
+        @param  part        :   the part of generation called (one of PARTS)
+        @param  start_time  :   perf_counter() time the call started at
+        """
+
+        self.calls[part] += 1
+        self.seconds[part] += perf_counter() - start_time
+
+    def getAverage(self, part):
+        """
+        @param  part    :   a timed part of generation
+
+        @return         :   average number of seconds spent per call to the part (0 if it was never called)
+        """
+
+        if self.calls[part] == 0:
+            return 0.0
+
+        return self.seconds[part] / self.calls[part]
+
+    def toDict(self):
+        """
+        get everything recorded as plain dictionaries and numbers, e.g. to export as metrics
+
+        @return :   dictionary of every counter, and the calls, seconds and average seconds of each
+                    timed part of generation
+        """
+
+        return {    "generations" : self.generations,
+                    "sources_tried" : self.sourcesTried,
+                    "sources_failed" : self.sourcesFailed,
+                    "walks_placed" : self.walksPlaced,
+                    "searches_placed" : self.searchesPlaced,
+                    "restarts_used" : self.restartsUsed,
+                    "sinks_rejected" : dict(self.sinksRejected),
+                    "calls" : dict(self.calls),
+                    "seconds" : dict(self.seconds),
+                    "average_seconds" : { part : self.getAverage(part) for part in self.calls }    }
@@ -0,0 +1,127 @@
+from stats import Stats
+from time import perf_counter
+import json
+
+"""
+record flow generation as a stream of events, to find out why generation gives up or retries on
+particular boards (see tools/replay.py for a summary of a recorded trace)
+
+events are written one JSON object per line (JSONL), with cells given by their flat index (see Grid;
+each generation's first event gives the grid's size):
+
+    { "event" : "generation", "rows" : rows, "cols" : cols, "engine" : engine }
+    { "event" : "source", "cell" : cell, "degree" : degree, "flow" : flow index }
+    { "event" : "reject", "sink" : cell, "rule" : rule }          (see Stats.RULES)
+    { "event" : "fail", "cell" : cell }                             (no legal path from the source)
+    { "event" : "place", "flow" : flow index, "walk" : whether the flow was walked, "path" : [ cells ] }
+    { "event" : "restart" }                                         (every flow placed so far is removed)
+    { "event" : "end", "finished" : whether the grid was filled, "steps" : steps, "restarts" : restarts, "seconds" : seconds }
+
+"""
+
+class Trace(Stats):
+    """
+    class to record flow generation as a stream of events, as well as counting them like Stats; pass
+    one to generateFlows() as its stats
+
+    required attributes:
+    --------------------
+    @attribute  stream      :   writable text file (or file-like object) the events are written to
+
+    optional attributes (default value):
+    ------------------------------------
+    @attribute  rejections  :   boolean of whether to write an event for every rejected sink, by far
+                                the most common event (True)
+
+    internal attributes:
+    --------------------
+    @attribute  startTime   :   perf_counter() time the current generation started at
+    """
+
+    def __init__(self, stream, rejections=True):
+        """
+        constructor for the Trace class
+
+        See class docstring for parameters
+        """
+
+        self.stream = stream
+        self.rejections = rejections
+        self.startTime = None
+
+        Stats.__init__(self)
+
+    def write(self, event):
+        """
+        write an event to the stream, as a single line of compact JSON
+
+        @param  event   :   dictionary of the event
+        """
+
+        self.stream.write(json.dumps(event, separators=(",", ":")) + "\n")
+
+    def startGeneration(self, grid, engine):
+        """
+        see Stats.startGeneration()
+        """
+
+        Stats.startGeneration(self, grid, engine)
+
+        self.startTime = perf_counter()
+        self.write({ "event" : "generation", "rows" : grid.rows, "cols" : grid.cols, "engine" : engine })
+
+    def endGeneration(self, grid, budget):
+        """
+        see Stats.endGeneration()
+        """
+
+        Stats.endGeneration(self, grid, budget)
+
+        self.write({    "event" : "end", "finished" : budget.finished, "steps" : budget.stepsUsed,
+                        "restarts" : budget.restartsUsed, "seconds" : perf_counter() - self.startTime  })
+
+    def addSource(self, grid, source, flow_index):
+        """
+        see Stats.addSource()
+        """
+
+        Stats.addSource(self, grid, source, flow_index)
+
+        self.write({ "event" : "source", "cell" : source, "degree" : grid.degreeAt(source), "flow" : flow_index })
+
+    def addRejection(self, sink, rule):
+        """
+        see Stats.addRejection()
+        """
+
+        Stats.addRejection(self, sink, rule)
+
+        if self.rejections:
+            self.write({ "event" : "reject", "sink" : sink, "rule" : rule })
+
+    def addFailure(self, source):
+        """
+        see Stats.addFailure()
+        """
+
+        Stats.addFailure(self, source)
+
+        self.write({ "event" : "fail", "cell" : source })
+
+    def addPlacement(self, path, flow_index, walked):
+        """
+        see Stats.addPlacement()
+        """
+
+        Stats.addPlacement(self, path, flow_index, walked)
+
+        self.write({ "event" : "place", "flow" : flow_index, "walk" : walked, "path" : path })
+
+    def addRestart(self):
+        """
+        see Stats.addRestart()
+        """
+
+        Stats.addRestart(self)
+
+        self.write({ "event" : "restart" })
@@ -0,0 +1,87 @@
+from context import Grid
+import backbite
+import unittest
+import random
+from ddt import ddt, data, unpack
+
+# (rows, cols, seed) of the grids to cover with a path
+cases = [ (2, 2, 0), (3, 5, 1), (8, 8, 2), (9, 11, 3), (1, 9, 4) ]
+
+@ddt
+class Test_backbite(unittest.TestCase):
+    """
+    test the backbite engine's Hamiltonian paths and its merging of the flows cut from them
+    """
+
+    def assertHamiltonian(self, grid, path):
+        """
+        check a path covers every cell of the grid once, stepping between adjacent cells
+
+        @param  grid    :   grid the path covers
+        @param  path    :   list of the path's cell indices
+        """
+
+        self.assertEqual(sorted(path), list(range(grid.size)))
+
+        for cell, next_cell in zip(path, path[1:]):
+            self.assertTrue(next_cell in grid.neighbors[cell])
+
+    @data(*cases)
+    @unpack
+    def test_moves(self, rows, cols, seed):
+        """
+        make backbite moves on a Hamiltonian path and check it's still one, and that no moves are
+        made once the reversed cells reach their bound
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the path and the moves
+        """
+
+        grid, rng = Grid([0, 0], 0, 0, rows, cols), random.Random(seed)
+
+        path = backbite.getHamiltonianPath(grid, rng)
+        self.assertHamiltonian(grid, path)
+
+        backbite.backbite(grid, path, 50 * grid.size, rng)
+        self.assertHamiltonian(grid, path)
+
+        moved = list(path)
+        backbite.backbite(grid, path, 50 * grid.size, rng, max_reversed = 0)
+        self.assertEqual(path, moved)
+
+    @data(*cases)
+    @unpack
+    def test_merge(self, rows, cols, seed):
+        """
+        merge the flows cut from a Hamiltonian path and check the merged flows are legal and cover
+        the grid
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the path and the cuts
+        """
+
+        grid, rng = Grid([0, 0], 0, 0, rows, cols), random.Random(seed)
+
+        path = backbite.getHamiltonianPath(grid, rng)
+        flows = backbite.cutPath(grid, path, rng)
+
+        if flows is None:
+            return
+
+        merged = backbite.mergeFlows(grid, flows, rng)
+
+        self.assertLessEqual(len(merged), len(flows))
+        self.assertEqual(sorted([ cell for flow in merged for cell in flow ]), list(range(grid.size)))
+
+        for value, flow in enumerate(merged):
+            self.assertGreaterEqual(len(flow), backbite.MIN_LENGTH)
+            self.assertTrue(all([ grid.cellValues[cell] == value for cell in flow ]))
+            self.assertTrue(backbite.isSelfAvoiding(grid, flow, value))
+
+            for cell, next_cell in zip(flow, flow[1:]):
+                self.assertTrue(next_cell in grid.neighbors[cell])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import sys
+import os
+from ddt import ddt, data, unpack
+
+sys.path.insert(0, os.path.abspath('../tools'))
+
+import benchmark
+
+# baseline benchmarks, by name
+baseline = {    "macro/generateFlows/8x8" : { "p50" : 0.01, "success_rate" : 1.0 },
+                "memory/generateFlows/8x8" : { "peak" : 20000, "net_blocks" : 40.0 },
+                "memory/walkFlow/8x8" : { "peak" : 800, "net_blocks" : 2.0 },
+                "memory/walkFlow/24x24" : { "peak" : 800, "net_blocks" : -200.0 }   }
+
+# (name, changed metrics, expected regressed metrics) of the results to compare with the baseline
+cases = [   ("macro/generateFlows/8x8", {}, []),
+            ("macro/generateFlows/8x8", { "p50" : 0.0119 }, []),
+            ("macro/generateFlows/8x8", { "p50" : 0.0121 }, [ "p50" ]),
+            ("macro/generateFlows/8x8", { "success_rate" : 0.95 }, []),
+            ("macro/generateFlows/8x8", { "success_rate" : 0.85 }, [ "success_rate" ]),
+            ("memory/generateFlows/8x8", { "peak" : 24096, "net_blocks" : 56.0 }, []),
+            ("memory/generateFlows/8x8", { "peak" : 24097, "net_blocks" : 56.1 }, [ "peak", "net_blocks" ]),
+            ("memory/walkFlow/8x8", { "peak" : 4896, "net_blocks" : 18.0 }, []),
+            ("memory/walkFlow/8x8", { "peak" : 4897 }, [ "peak" ]),
+            ("memory/walkFlow/8x8", { "net_blocks" : 18.5 }, [ "net_blocks" ]),
+            ("memory/walkFlow/24x24", { "net_blocks" : -160.0 }, []),
+            ("memory/walkFlow/24x24", { "net_blocks" : -150.0 }, [ "net_blocks" ])   ]
+
+@ddt
+class Test_compareResults(unittest.TestCase):
+    """
+    test that compareResults() flags the metrics that grew past the threshold or their absolute floor
+    """
+
+    @data(*cases)
+    @unpack
+    def test_regressions(self, name, changes, expected):
+        """
+        change some metrics of a baseline benchmark and check which ones are flagged
+
+        @param  name        :   name of the benchmark to change
+        @param  changes     :   dictionary of the new value of each changed metric
+        @param  expected    :   list of the metrics that should be flagged
+        """
+
+        benchmarks = { benchmark_name : dict(summary) for benchmark_name, summary in baseline.items() }
+        benchmarks[name].update(changes)
+
+        regressions = benchmark.compareResults({ "benchmarks" : benchmarks }, { "benchmarks" : baseline })
+
+        self.assertEqual(sorted([ metric for regression_name, metric, old, new in regressions ]), sorted(expected))
+
+        for regression_name, metric, old, new in regressions:
+            self.assertEqual(regression_name, name)
+            self.assertEqual((old, new), (baseline[name][metric], changes[metric]))
+
+    def test_missing(self):
+        """
+        check benchmarks missing from either side are skipped
+        """
+
+        results = { "benchmarks" : { "memory/walkFlow/8x8" : { "peak" : 10 ** 6, "net_blocks" : 10 ** 3 } } }
+
+        self.assertEqual(benchmark.compareResults(results, { "benchmarks" : {} }), [])
+        self.assertEqual(len(benchmark.compareResults(results, { "benchmarks" : baseline })), 2)
+        self.assertEqual(benchmark.compareResults({ "benchmarks" : {} }, { "benchmarks" : baseline }), [])
+
+    def test_baseline_file(self):
+        """
+        check memory results are compared against the memory baseline by default
+        """
+
+        memory = { "benchmarks" : { name : summary for name, summary in baseline.items() if name.startswith(benchmark.MEMORY_PREFIX) } }
+
+        self.assertEqual(benchmark.getBaselineFile(memory), benchmark.MEMORY_BASELINE_FILE)
+        self.assertEqual(benchmark.getBaselineFile({ "benchmarks" : baseline }), benchmark.BASELINE_FILE)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+from context import Grid, generator
+import bitboard
+import unittest
+import random
+from ddt import ddt, data, unpack
+
+# grid shapes to check (rows, cols)
+shapes = [ (1, 1), (1, 6), (5, 1), (4, 7), (16, 16), (23, 19) ]
+
+@ddt
+class Test_bitboard(unittest.TestCase):
+    """
+    test that bitboard operations agree with the Grid's index-based cell state
+    """
+
+    @data(*shapes)
+    @unpack
+    def test_cases(self, rows, cols):
+        """
+        randomly occupy cells and compare the bitboard of unoccupied cells and its components with
+        the grid's
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        """
+
+        grid = Grid([0, 0], 0, 0, rows = rows, cols = cols)
+        rng = random.Random(rows * cols)
+
+        for step in range(3):
+            for index in range(grid.size):
+                if rng.random() < 0.3:
+                    grid.setAt(index, step)
+                else:
+                    grid.resetAt(index)
+
+            bits = grid.emptyBits
+            empty = grid.getEmptyIndices()
+
+            self.assertEqual([ index for index in range(grid.size) if bits >> index & 1 ], empty)
+
+            # components
+            if len(empty) > 0:
+                components = [ [ index for index in range(grid.size) if component >> index & 1 ] for component in bitboard.iterComponents(bits, rows, cols) ]
+
+                self.assertEqual(components, [ sorted(component) for component in generator.getEmptyComponentIndices(grid) ])
+                self.assertEqual([ len(component) for component in components ], generator.getEmptyComponentSizes(grid))
+
+        # the bitboard follows the grid through a clear
+        grid.clearValues()
+        self.assertEqual(grid.emptyBits, bitboard.getMasks(rows, cols)[0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+from context import Grid, generator
+import unittest
+from ddt import ddt, data, unpack
+
+# (rows, cols, seed, generation engine)
+cases = [   (5, 5, 0, generator.SEARCH_ENGINE),
+            (12, 9, 1, generator.SEARCH_ENGINE),
+            (10, 10, 2, generator.WALK_ENGINE),
+            (16, 16, 3, generator.BACKBITE_ENGINE),
+            (15, 21, 4, generator.BACKBITE_ENGINE)   ]
+
+@ddt
+class Test_combinePaths(unittest.TestCase):
+    """
+    test that combinePaths() only merges flows into legal flows covering the same cells
+    """
+
+    @data(*cases)
+    @unpack
+    def test_cases(self, rows, cols, seed, engine):
+        """
+        merge the flows of a generated grid and check every merged flow is legal and matches the grid
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the generation and the merging
+        @param  engine  :   engine generating the flows
+        """
+
+        grid = Grid([0, 0], 0, 0, rows, cols)
+        paths = generator.generateFlows(grid, seed = seed, engine = engine)
+        merged = generator.combinePaths(grid, paths, seed = seed)
+
+        self.assertTrue(len(merged) <= len(paths))
+        self.assertEqual(sorted([ cell for path in merged for cell in path ]), sorted([ cell for path in paths for cell in path ]))
+
+        for index, path in enumerate(merged):
+            self.assertTrue(len(path) >= 3)
+            self.assertTrue(all([ abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]) ]))
+
+            # every cell is labelled with its flow and only touches the cells before and after it
+            for position, cell in enumerate(path):
+                self.assertEqual(grid.values[cell], index)
+                self.assertEqual(grid.valueDegree(cell, index), 1 if position in (0, len(path) - 1) else 2)
+
+    def test_merge(self):
+        """
+        merge two flows whose ends meet in the middle of a 1x8 grid
+        """
+
+        grid = Grid([0, 0], 0, 0, 1, 8)
+        paths = [ [ (3, 0), (2, 0), (1, 0), (0, 0) ], [ (4, 0), (5, 0), (6, 0), (7, 0) ] ]
+
+        merged = generator.combinePaths(grid, paths)
+
+        self.assertEqual(len(merged), 1)
+        self.assertIn(merged[0], [ [ (col, 0) for col in range(8) ], [ (col, 0) for col in reversed(range(8)) ] ])
+
+if __name__ == '__main__':
+    unittest.main()
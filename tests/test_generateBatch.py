@@ -0,0 +1,66 @@
+from context import Grid
+import unittest
+from ddt import ddt, data, unpack
+
+try:
+    import batch
+except ImportError:
+    batch = None
+
+# (rows, cols, number of boards, seed)
+cases = [ (1, 6, 20, 0), (3, 3, 50, 1), (5, 5, 200, 2), (7, 9, 100, 3), (9, 9, 100, 4) ]
+
+@ddt
+@unittest.skipIf(batch is None, "the batch engine needs NumPy")
+class Test_generateBatch(unittest.TestCase):
+    """
+    test that generateBatch() fills every board with legal flows that never touch themselves
+    """
+
+    @data(*cases)
+    @unpack
+    def test_cases(self, rows, cols, n, seed):
+        """
+        generate a batch of boards, place each board's flows in a grid and check them
+
+        @param  rows    :   number of rows in the grids
+        @param  cols    :   number of columns in the grids
+        @param  n       :   number of boards to generate
+        @param  seed    :   seed for the generation
+        """
+
+        results = batch.generateBatch(rows, cols, n, seed = seed)
+        self.assertEqual(len(results), n)
+
+        grid = Grid([0, 0], 0, 0, rows, cols)
+
+        for paths in results:
+            self.assertIsNotNone(paths)
+
+            grid.clearValues()
+            for value, path in enumerate(paths):
+                self.assertTrue(len(path) >= 3)
+                self.assertTrue(all([ abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]) ]))
+
+                for cell in path:
+                    self.assertTrue(grid.isEmpty(cell))
+                    grid.setCell(cell, value)
+
+            self.assertEqual(len(grid.unoccupied), 0)
+
+            for value, path in enumerate(paths):
+                for position, cell in enumerate(path):
+                    self.assertEqual(grid.valueDegree(cell, value), 1 if position in (0, len(path) - 1) else 2)
+
+        # the same seed gives the same flows
+        self.assertEqual(batch.generateBatch(rows, cols, n, seed = seed), results)
+
+    def test_impossible(self):
+        """
+        make sure boards that can't be filled with legal flows are given up on
+        """
+
+        self.assertEqual(batch.generateBatch(2, 2, 10, seed = 0, restarts = 3), [ None ] * 10)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,223 @@
+from context import Grid, generator
+from budget import Budget
+from stats import Stats
+import backbite
+import unittest
+from ddt import ddt, data, unpack
+
+# (rows, cols, seed) of grids that can be filled
+cases = [ (3, 3, 0), (5, 5, 1), (8, 6, 2), (12, 12, 3) ]
+
+def checkPaths(test, grid, paths):
+    """
+    check that the paths are legal flows and match the cells occupied in the grid
+
+    @param  test    :   test case making the assertions
+    @param  grid    :   grid the paths were generated on
+    @param  paths   :   list of generated paths
+    """
+
+    cells = [ cell for path in paths for cell in path ]
+
+    test.assertEqual(len(cells), len(set(cells)))
+    test.assertEqual(len(cells) + len(grid.unoccupied), grid.rows * grid.cols)
+
+    for path in paths:
+        test.assertTrue(len(path) >= 3)
+        test.assertTrue(all([ abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]) ]))
+
+@ddt
+class Test_generateFlows(unittest.TestCase):
+    """
+    test that generateFlows() fills grids, respects its budget and reports how it went
+    """
+
+    @data(*cases)
+    @unpack
+    def test_finished(self, rows, cols, seed):
+        """
+        fill a grid without limits and check the budget reports it
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the generation
+        """
+
+        grid, budget = Grid([0, 0], 0, 0, rows, cols), Budget()
+        paths = generator.generateFlows(grid, seed = seed, budget = budget)
+
+        self.assertTrue(budget.finished)
+        self.assertEqual(len(grid.unoccupied), 0)
+        checkPaths(self, grid, paths)
+
+    @data(*cases)
+    @unpack
+    def test_walk_engine(self, rows, cols, seed):
+        """
+        fill a grid with the random-walk engine and check its flows are just as legal
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the generation
+        """
+
+        grid, budget = Grid([0, 0], 0, 0, rows, cols), Budget()
+        paths = generator.generateFlows(grid, seed = seed, budget = budget, engine = generator.WALK_ENGINE)
+
+        self.assertTrue(budget.finished)
+        self.assertEqual(len(grid.unoccupied), 0)
+        checkPaths(self, grid, paths)
+
+        # the same seed gives the same flows
+        grid.clearValues()
+        self.assertEqual(generator.generateFlows(grid, seed = seed, engine = generator.WALK_ENGINE), paths)
+
+    @data(*(cases + [ (1, 7, 4), (7, 9, 5), (30, 25, 6) ]))
+    @unpack
+    def test_backbite_engine(self, rows, cols, seed):
+        """
+        fill a grid with flows cut from a Hamiltonian path and check they're legal and never touch themselves
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the generation
+        """
+
+        grid, budget = Grid([0, 0], 0, 0, rows, cols), Budget()
+        paths = generator.generateFlows(grid, seed = seed, budget = budget, engine = generator.BACKBITE_ENGINE)
+
+        self.assertTrue(budget.finished)
+        self.assertEqual(len(grid.unoccupied), 0)
+        checkPaths(self, grid, paths)
+
+        for path in paths:
+            for position, cell in enumerate(path):
+                self.assertEqual(grid.valueDegree(cell, grid.values[path[0]]), 1 if position in (0, len(path) - 1) else 2)
+
+    def test_unknown_engine(self):
+        """
+        check an unknown engine is refused, and leaves the grid as it was
+
+        """
+
+        grid = Grid([0, 0], 0, 0, 5, 5)
+
+        self.assertRaises(ValueError, generator.generateFlows, grid, seed = 0, engine = "bogus")
+        self.assertEqual(len(grid.unoccupied), 25)
+        self.assertEqual(grid.trail, None)
+
+    def test_backbite_occupied(self):
+        """
+        check the backbite engine refuses a grid that isn't empty, and leaves it as it was
+
+        """
+
+        grid = Grid([0, 0], 0, 0, 6, 6)
+        grid.setCell((2, 3), 0)
+
+        self.assertRaises(ValueError, generator.generateFlows, grid, seed = 0, engine = generator.BACKBITE_ENGINE)
+        self.assertRaises(ValueError, backbite.placeBackbiteFlows, grid, generator.getRandom(0), Budget())
+
+        self.assertEqual(len(grid.unoccupied), 35)
+        self.assertEqual(grid.trail, None)
+
+    @data(*cases)
+    @unpack
+    def test_step_limit(self, rows, cols, seed):
+        """
+        stop generation after a single source cell and check the partial result
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the generation
+        """
+
+        grid, budget = Grid([0, 0], 0, 0, rows, cols), Budget(steps = 1)
+        paths = generator.generateFlows(grid, seed = seed, budget = budget)
+
+        self.assertEqual(budget.stepsUsed, 1)
+        self.assertEqual(budget.finished, len(grid.unoccupied) == 0)
+        checkPaths(self, grid, paths)
+
+    @data(*cases)
+    @unpack
+    def test_stats(self, rows, cols, seed):
+        """
+        record a generation in a Stats and check it matches the budget, and that recording doesn't
+        change the flows generated
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        @param  seed    :   seed for the generation
+        """
+
+        grid = Grid([0, 0], 0, 0, rows, cols)
+        paths = generator.generateFlows(grid, seed = seed)
+
+        grid.clearValues()
+        budget, stats = Budget(), Stats()
+        self.assertEqual(generator.generateFlows(grid, seed = seed, budget = budget, stats = stats), paths)
+
+        self.assertEqual(stats.generations, 1)
+        self.assertEqual(stats.sourcesTried, budget.stepsUsed)
+        self.assertEqual(stats.restartsUsed, budget.restartsUsed)
+        self.assertEqual(stats.calls[Stats.SEARCH], stats.calls[Stats.VALIDATION])
+        self.assertTrue(stats.walksPlaced + stats.searchesPlaced >= len(paths))
+
+        # sinks are only rejected by searches, and every search checks the components once
+        self.assertTrue(stats.calls[Stats.COMPONENTS] >= stats.calls[Stats.VALIDATION])
+        if stats.calls[Stats.SEARCH] == 0:
+            self.assertEqual(sum(stats.sinksRejected.values()), 0)
+
+        # the counts add up over generations
+        grid.clearValues()
+        generator.generateFlows(grid, seed = seed, stats = stats)
+        self.assertEqual(stats.generations, 2)
+        self.assertEqual(stats.sourcesTried, 2 * budget.stepsUsed)
+
+    @data(  ([], [ 2, 3, 6, 9 ], 1, 4, 0),
+            ([ (7, 0) ], [ 6 ], 1, 3, 1)    )
+    @unpack
+    def test_rejection_rules(self, occupied, legal, short, block, component):
+        """
+        check the sinks of a single row are rejected by the right rules, from its first cell
+
+        @param  occupied    :   list of the cells occupied before the search
+        @param  legal       :   list of the indices of the sinks whose paths are legal
+        @param  short       :   number of sinks rejected for paths under 3 cells long
+        @param  block       :   number of sinks rejected for leaving an illegal rest of the source's component
+        @param  component   :   number of sinks rejected for leaving an illegal component elsewhere
+        """
+
+        grid, stats = Grid([0, 0], 0, 0, 1, 10), Stats()
+        for cell in occupied:
+            grid.setCell(cell, 0)
+
+        tree = generator.getDegreeMinimizedPathTree(grid, 0)
+
+        self.assertEqual(sorted(generator.getLegalSinkIndices(grid, tree, stats)), legal)
+        self.assertEqual(stats.sinksRejected, { Stats.SHORT : short, Stats.BLOCK : block, Stats.COMPONENT : component })
+
+    def test_impossible(self):
+        """
+        make sure generation gives up on a grid that can't be filled with legal flows
+        """
+
+        grid, budget = Grid([0, 0], 0, 0, 2, 2), Budget(restarts = 5)
+        paths = generator.generateFlows(grid, budget = budget)
+
+        self.assertFalse(budget.finished)
+        self.assertEqual(budget.restartsUsed, 5)
+        self.assertEqual(paths, [])
+
+    def test_luby(self):
+        """
+        check the start of the Luby restart schedule
+        """
+
+        terms = [ Budget.getLubyTerm(i) for i in range(1, 16) ]
+
+        self.assertEqual(terms, [ 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8 ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from context import Grid, generator
+import unittest
+import random
+from ddt import ddt, data, unpack
+
+# (rows, cols, number of sets of flows, first seed)
+cases = [ (4, 4, 6, 0), (7, 5, 4, 11), (9, 9, 3, 2019) ]
+
+@ddt
+class Test_generateMany(unittest.TestCase):
+    """
+    test that the generateMany() batch API and the iterFlows() stream are reproducible and return valid flows
+    """
+
+    @data(*cases)
+    @unpack
+    def test_cases(self, rows, cols, n, first_seed):
+        """
+        generate the same batch in this process and in a pool, and check every set of paths
+        covers each cell of the grid at most once
+
+        @param  rows        :   number of rows in the generated grids
+        @param  cols        :   number of columns in the generated grids
+        @param  n           :   number of sets of flows to generate
+        @param  first_seed  :   seed of the first set of flows
+        """
+
+        serial = generator.generateMany(rows, cols, n, workers = 1, first_seed = first_seed)
+        pooled = generator.generateMany(rows, cols, n, workers = 2, first_seed = first_seed)
+
+        self.assertEqual(serial, pooled)
+
+        for encoded in serial:
+            cells = [ cell for path in generator.decodePaths(encoded, rows) for cell in path ]
+
+            self.assertEqual(len(cells), len(set(cells)))
+            self.assertTrue(all([ 0 <= col < cols and 0 <= row < rows for col, row in cells ]))
+
+    @data(*cases)
+    @unpack
+    def test_iterFlows(self, rows, cols, n, first_seed):
+        """
+        stream the same sets of flows with and without prefetching and compare them with generateMany()
+
+        @param  rows        :   number of rows in the generated grids
+        @param  cols        :   number of columns in the generated grids
+        @param  n           :   number of sets of flows to generate
+        @param  first_seed  :   seed of the first set of flows
+        """
+
+        batch = [ generator.decodePaths(encoded, rows) for encoded in generator.generateMany(rows, cols, n, workers = 1, first_seed = first_seed) ]
+
+        streamed = list(generator.iterFlows(rows, cols, first_seed = first_seed, count = n))
+        prefetched = list(generator.iterFlows(rows, cols, first_seed = first_seed, count = n, prefetch = 2, workers = 2))
+
+        self.assertEqual(streamed, batch)
+        self.assertEqual(prefetched, batch)
+
+    @data(*cases)
+    @unpack
+    def test_seeds(self, rows, cols, n, first_seed):
+        """
+        replay the last set of a batch from its seed, both as an integer and as a random.Random instance
+
+        @param  rows        :   number of rows in the generated grids
+        @param  cols        :   number of columns in the generated grids
+        @param  n           :   number of sets of flows to generate
+        @param  first_seed  :   seed of the first set of flows
+        """
+
+        batch = generator.generateMany(rows, cols, n, workers = 1, first_seed = first_seed)
+        last = generator.decodePaths(batch[-1], rows)
+
+        self.assertEqual(generator.generateFlows(Grid([0, 0], 0, 0, rows, cols), seed = first_seed + n - 1), last)
+        self.assertEqual(generator.generateFlows(Grid([0, 0], 0, 0, rows, cols), seed = random.Random(first_seed + n - 1)), last)
+
+if __name__ == '__main__':
+    unittest.main()
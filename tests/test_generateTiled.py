@@ -0,0 +1,83 @@
+from context import Grid, generator
+import unittest
+from ddt import ddt, data, unpack
+
+# (rows, cols, tile size, seed)
+cases = [ (10, 10, 16, 0), (20, 17, 8, 1), (33, 30, 10, 2) ]
+
+@ddt
+class Test_generateTiled(unittest.TestCase):
+    """
+    test that tiled generation fills the whole grid with legal flows, regardless of the number of workers
+    """
+
+    @data(*cases)
+    @unpack
+    def test_cases(self, rows, cols, tile_size, seed):
+        """
+        fill a grid tile by tile in this process and in a pool, and check the stitched flows
+
+        @param  rows        :   number of rows in the grid
+        @param  cols        :   number of columns in the grid
+        @param  tile_size   :   number of rows and columns in each tile
+        @param  seed        :   seed for the generation
+        """
+
+        grid = Grid([0, 0], 0, 0, rows, cols)
+        serial = generator.generateTiled(grid, tile_size = tile_size, seed = seed, workers = 1)
+
+        self.assertEqual(len(grid.unoccupied), 0)
+        self.assertEqual(sorted([ cell for path in serial for cell in path ]), sorted(grid.getAllCellCoordinates()))
+
+        for index, path in enumerate(serial):
+            self.assertTrue(len(path) >= 3)
+            self.assertTrue(all([ abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(path, path[1:]) ]))
+            self.assertTrue(all([ grid.values[cell] == index for cell in path ]))
+
+        pooled = generator.generateTiled(Grid([0, 0], 0, 0, rows, cols), tile_size = tile_size, seed = seed, workers = 2)
+
+        self.assertEqual(serial, pooled)
+
+    def test_bounds(self):
+        """
+        check that leftovers too short to be tiles of their own are added to the last tile
+        """
+
+        self.assertEqual(generator.getTileBounds(10, 16), [ (0, 10) ])
+        self.assertEqual(generator.getTileBounds(20, 8), [ (0, 8), (8, 8), (16, 4) ])
+        self.assertEqual(generator.getTileBounds(17, 8), [ (0, 8), (8, 9) ])
+
+    @data(0, 1, 2)
+    def test_small_tiles(self, tile_size):
+        """
+        check that tiles too small to hold a flow are refused
+
+        @param  tile_size   :   number of rows and columns in each tile
+        """
+
+        grid = Grid([0, 0], 0, 0, 10, 10)
+
+        self.assertRaises(ValueError, generator.generateTiled, grid, tile_size = tile_size, seed = 0, workers = 1)
+        self.assertEqual(len(grid.unoccupied), 100)
+
+    def test_occupied(self):
+        """
+        check that a grid that isn't empty is refused, and left as it was
+        """
+
+        grid = Grid([0, 0], 0, 0, 10, 10)
+        grid.setCell((4, 5), "kept")
+
+        self.assertRaises(ValueError, generator.generateTiled, grid, tile_size = 5, seed = 0, workers = 1)
+        self.assertEqual(grid.values[(4, 5)], "kept")
+        self.assertEqual(len(grid.unoccupied), 99)
+
+    def test_unknown_engine(self):
+        """
+        check that an unknown engine is refused before any tile is generated
+        """
+
+        self.assertRaises(ValueError, generator.generateTiled, Grid([0, 0], 0, 0, 10, 10), tile_size = 5, workers = 2, engine = "bogus")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+from context import Grid, generator
+import unittest
+import heapq
+from ddt import ddt, data, unpack
+
+# (rows, cols, occupied cells, source cell) of the boards to search
+boards = [  (3, 3, [], (0, 0)),
+            (3, 3, [ (0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1) ], (1, 1)),
+            (5, 5, [ (0, 4), (1, 4), (2, 4), (3, 4), (4, 4), (4, 3), (4, 2), (4, 1), (3, 1), (2, 1) ], (0, 3)),
+            (4, 6, [ (2, 0), (2, 1), (2, 2), (2, 3) ], (0, 1)),
+            (6, 6, [ (1, 1), (1, 2), (3, 3), (4, 3), (4, 4), (2, 5) ], (5, 0)),
+            (1, 7, [ (4, 0) ], (1, 0))  ]
+
+# (rows, cols, occupied cells, source cell, sink cell, path from the source to the sink)
+paths = [   (3, 3, [ (0, 0), (0, 1), (0, 2), (1, 2), (2, 2), (2, 1) ], (1, 1), (2, 0), [ (1, 1), (1, 0), (2, 0) ]),
+            (5, 5, [], (1, 3), (2, 0), [ (1, 3), (1, 2), (1, 1), (1, 0), (2, 0) ]),
+            (5, 5, [ (0, 4), (1, 4), (2, 4), (3, 4), (4, 4), (4, 3), (4, 2), (4, 1), (3, 1), (2, 1) ], (0, 3), (2, 0),
+                    [ (0, 3), (0, 2), (0, 1), (0, 0), (1, 0), (2, 0) ])    ]
+
+def getGrid(rows, cols, occupied):
+    """
+    make a grid with the given cells occupied
+
+    @param  rows        :   number of rows in the grid
+    @param  cols        :   number of columns in the grid
+    @param  occupied    :   list of the cells to occupy
+
+    @return             :   the grid
+    """
+
+    grid = Grid([0, 0], 0, 0, rows, cols)
+    for cell in occupied:
+        grid.setCell(cell, True)
+
+    return grid
+
+def getLowestCosts(grid, source):
+    """
+    find the lowest total degree of a path from the source to every cell it can reach, with a plain
+    heap-based Dijkstra search (the source's own degree isn't counted)
+
+    @param  grid    :   grid containing the source
+    @param  source  :   index of the source cell
+
+    @return         :   dictionary of the lowest total degree of each reachable cell index
+    """
+
+    costs, heap = {}, [ (0, source) ]
+
+    while len(heap) > 0:
+        cost, cell = heapq.heappop(heap)
+
+        if cell in costs:
+            continue
+
+        costs[cell] = cost
+
+        for neighbor in grid.neighbors[cell]:
+            if grid.isEmptyAt(neighbor) and not neighbor in costs:
+                heapq.heappush(heap, (cost + grid.degreeAt(neighbor), neighbor))
+
+    return costs
+
+@ddt
+class Test_getDegreeMinimizedPathTree(unittest.TestCase):
+    """
+    test that the PathTree returned by getDegreeMinimizedPathTree() is consistent, and that its
+    paths are degree-minimized
+    """
+
+    @data(*boards)
+    @unpack
+    def test_invariants(self, rows, cols, occupied, source):
+        """
+        check the tree's parents, depths and order against each other and against the board
+
+        @param  rows        :   number of rows in the grid
+        @param  cols        :   number of columns in the grid
+        @param  occupied    :   list of the cells occupied before the search
+        @param  source      :   cell the paths start from
+        """
+
+        grid = getGrid(rows, cols, occupied)
+        source = grid.getIndex(source)
+
+        tree = generator.getDegreeMinimizedPathTree(grid, source)
+        costs = getLowestCosts(grid, source)
+
+        # the tree holds exactly the source's component, each cell once, starting with the source
+        self.assertEqual(tree.order[0], source)
+        self.assertEqual(len(tree.order), len(set(tree.order)))
+        self.assertEqual(set(tree.order), set(costs))
+        self.assertEqual(tree.getSize(), len(costs))
+
+        self.assertIsNone(tree.parents[source])
+        self.assertEqual(tree.depths[source], 0)
+
+        order_costs = [ costs[cell] for cell in tree.order ]
+        self.assertEqual(order_costs, sorted(order_costs))
+
+        position = { cell : index for index, cell in enumerate(tree.order) }
+
+        for cell in range(grid.size):
+            if not cell in costs:
+                self.assertFalse(tree.reaches(cell))
+                self.assertIsNone(tree.parents[cell])
+                self.assertIsNone(tree.depths[cell])
+                continue
+
+            self.assertTrue(tree.reaches(cell))
+
+            if cell == source:
+                continue
+
+            # parents are adjacent, unoccupied, one step closer and added to the tree first
+            parent = tree.parents[cell]
+
+            self.assertTrue(parent in grid.neighbors[cell])
+            self.assertTrue(grid.isEmptyAt(parent))
+            self.assertEqual(tree.depths[cell], tree.depths[parent] + 1)
+            self.assertLess(position[parent], position[cell])
+
+            # the path to every cell has the lowest possible total degree
+            path = tree.getPath(cell)
+
+            self.assertEqual(sum([ grid.degreeAt(path_cell) for path_cell in path[1:] ]), costs[cell])
+
+    @data(*paths)
+    @unpack
+    def test_paths(self, rows, cols, occupied, source, sink, path):
+        """
+        rebuild the path to a sink on a small board and compare it with the known degree-minimized path
+
+        @param  rows        :   number of rows in the grid
+        @param  cols        :   number of columns in the grid
+        @param  occupied    :   list of the cells occupied before the search
+        @param  source      :   cell the paths start from
+        @param  sink        :   cell the path ends at
+        @param  path        :   known path from the source to the sink, including both
+        """
+
+        grid = getGrid(rows, cols, occupied)
+        tree = generator.getDegreeMinimizedPathTree(grid, grid.getIndex(source))
+        sink = grid.getIndex(sink)
+
+        self.assertEqual([ grid.getCell(cell) for cell in tree.getPath(sink) ], path)
+        self.assertEqual(tree.getLength(sink), len(path))
+        self.assertEqual([ grid.getCell(cell) for cell in tree.iterPath(sink) ], path[::-1])
+
+if __name__ == '__main__':
+    unittest.main()
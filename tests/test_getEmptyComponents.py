@@ -0,0 +1,58 @@
+import setup_getDegreeMinimizedShortestPaths as setup
+from context import generator
+import unittest
+from ddt import ddt, data, unpack
+
+# current known test cases (see test_cases() parameters for information)
+cases = []
+cases.append((  3,
+                3,
+                [],
+                [ 9 ]
+            ))
+cases.append((  3,
+                3,
+                [ (1, 0), (1, 1), (1, 2) ],
+                [ 3, 3 ]
+            ))
+cases.append((  4,
+                4,
+                [ (1, 0), (0, 1), (3, 2), (2, 3), (2, 2) ],
+                [ 1, 1, 9 ]
+            ))
+cases.append((  5,
+                5,
+                [ (0, 2), (1, 2), (2, 2), (3, 2), (4, 2), (2, 0), (2, 1) ],
+                [ 4, 4, 10 ]
+            ))
+
+@ddt
+class Test_getEmptyComponents(unittest.TestCase):
+    """
+    test the getEmptyComponents() and getEmptyComponentSizes() functions for correctness
+    """
+
+    @data(*cases)
+    @unpack
+    def test_cases(self, rows, cols, occupied, sizes):
+        """
+        try a few known test cases to make sure both ways of finding components agree
+
+        @param  rows        :   number of rows in grid used for the test case
+        @param  cols        :   number of columns in grid used for the test case
+        @param  occupied    :   cells marked as occupied for the test case
+        @param  sizes       :   sorted sizes of the components of unoccupied cells
+        """
+
+        grid = setup.getGrid(rows, cols)
+        for cell in occupied:
+            grid.setCell(cell, True)
+
+        components = generator.getEmptyComponents(grid)
+
+        self.assertEqual(sorted([ len(component) for component in components ]), sizes)
+        self.assertEqual(sorted(generator.getEmptyComponentSizes(grid)), sizes)
+        self.assertEqual(sorted([ cell for component in components for cell in component ]), sorted(grid.unoccupied))
+
+if __name__ == '__main__':
+    unittest.main()
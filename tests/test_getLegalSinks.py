@@ -0,0 +1,79 @@
+import setup_getDegreeMinimizedShortestPaths as setup
+from context import generator
+import unittest
+import random
+from ddt import ddt, data, unpack
+
+# (rows, cols, fraction of cells occupied, seed) for randomly generated boards
+cases = [ (rows, cols, density, seed)   for rows, cols in [ (3, 3), (4, 7), (6, 6), (8, 5), (10, 10) ]
+                                        for density in [ 0.0, 0.2, 0.4 ]
+                                        for seed in range(3) ]
+
+def getLegalSinksByBFS(grid, source):
+    """
+    find the sinks with legal paths from the source by occupying each path and checking
+    the resulting components with getEmptyComponents()
+
+    @param  grid    :   grid containing the relevant cells
+    @param  source  :   source cell of the paths
+
+    @return         :   list of sink cells with legal paths
+    """
+
+    parents = generator.getDegreeMinimizedShortestPaths(grid, source)
+    paths = setup.getPathsFromParents(source, { cell : parents[cell] for cell in parents if cell == source or not parents[cell] == None })
+    block_size = len(paths)
+
+    sinks = []
+    for sink in paths.keys():
+        path = [ source ] + paths[sink]
+        remaining_in_block = block_size - len(path)
+
+        if len(path) < 3 or not generator.isLegalComponentSize(remaining_in_block):
+            continue
+
+        if remaining_in_block > 0:
+            for cell in path:
+                grid.setCell(cell, True)
+
+            components = generator.getEmptyComponents(grid)
+
+            for cell in path:
+                grid.resetCell(cell)
+
+            if not all([ generator.isLegalComponentSize(len(component)) for component in components ]):
+                continue
+
+        sinks.append(sink)
+
+    return sinks
+
+@ddt
+class Test_getLegalSinks(unittest.TestCase):
+    """
+    test the getLegalSinks() function against occupying every path and running getEmptyComponents()
+    """
+
+    @data(*cases)
+    @unpack
+    def test_random_boards(self, rows, cols, density, seed):
+        """
+        compare the legal sinks of every unoccupied source cell on a randomly filled board
+
+        @param  rows    :   number of rows in grid used for the test case
+        @param  cols    :   number of columns in grid used for the test case
+        @param  density :   fraction of cells occupied before the test
+        @param  seed    :   seed used to choose the occupied cells
+        """
+
+        grid = setup.getGrid(rows, cols)
+        rng = random.Random(seed)
+        for cell in grid.getAllCellCoordinates():
+            if rng.random() < density:
+                grid.setCell(cell, True)
+
+        for source in list(grid.unoccupied):
+            self.assertEqual(sorted(generator.getLegalSinks(grid, source)), sorted(getLegalSinksByBFS(grid, source)))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,250 @@
+from context import Grid
+import unittest
+import random
+from ddt import ddt, data, unpack
+
+# grid shapes to check (rows, cols)
+shapes = [ (1, 1), (1, 5), (4, 3), (6, 6), (9, 7) ]
+
+def countDegree(grid, cell):
+    """
+    count the unoccupied neighbors of a cell from scratch
+
+    @param  grid    :   grid containing the cell
+    @param  cell    :   2-tuple of 0-indexed (column, row) pair
+
+    @return         :   number of adjacent unassigned cells
+    """
+
+    col, row = cell
+    adjacent = [ (col - 1, row), (col, row - 1), (col + 1, row), (col, row + 1) ]
+
+    return len([ next_cell for next_cell in adjacent if grid.isEmpty(next_cell) ])
+
+@ddt
+class Test_Grid(unittest.TestCase):
+    """
+    test that the Grid's derived cell state stays consistent with its occupancy
+    """
+
+    @data(*shapes)
+    @unpack
+    def test_degrees(self, rows, cols):
+        """
+        randomly occupy and free cells and compare every cell's degree with a recount
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        """
+
+        grid = Grid([0, 0], 0, 0, rows = rows, cols = cols)
+        rng = random.Random(rows * cols)
+
+        for step in range(200):
+            cell = rng.choice(grid.getAllCellCoordinates())
+
+            if grid.isEmpty(cell):
+                grid.setCell(cell, step)
+            else:
+                grid.resetCell(cell)
+
+            for cell in grid.getAllCellCoordinates():
+                self.assertEqual(grid.degree(cell), countDegree(grid, cell))
+
+        self.assertEqual(len(grid.unoccupied), len([ cell for cell in grid.values if grid.values[cell] is None ]))
+
+        # clearing is lazy, so check the grid both before and after it is next changed
+        grid.clearValues()
+        self.assertEqual(len(grid.unoccupied), rows * cols)
+
+        for cell in grid.getAllCellCoordinates():
+            self.assertEqual(grid.degree(cell), countDegree(grid, cell))
+            self.assertIsNone(grid.values[cell])
+
+        grid.setCell((0, 0), True)
+        grid.clearValues()
+        grid.clearValues()
+        self.assertTrue(grid.isEmpty((0, 0)))
+        self.assertEqual(set(grid.unoccupied), set(grid.getAllCellCoordinates()))
+
+    @data(*shapes)
+    @unpack
+    def test_rollback(self, rows, cols):
+        """
+        make random changes after nested checkpoints and make sure rolling back restores every
+        cell's value, occupancy and degree
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        """
+
+        grid = Grid([0, 0], 0, 0, rows = rows, cols = cols)
+        rng = random.Random(rows + cols)
+
+        def snapshot():
+            return ( dict(grid.values), set(grid.unoccupied), [ grid.degree(cell) for cell in grid.getAllCellCoordinates() ] )
+
+        def change(steps):
+            for step in range(steps):
+                cell = rng.choice(grid.getAllCellCoordinates())
+
+                if grid.isEmpty(cell) or rng.random() < 0.3:
+                    grid.setCell(cell, step)
+                else:
+                    grid.resetCell(cell)
+
+        change(20)
+        outer_state, outer = snapshot(), grid.checkpoint()
+
+        change(30)
+        inner_state, inner = snapshot(), grid.checkpoint()
+
+        change(30)
+        grid.rollback(inner)
+        self.assertEqual(snapshot(), inner_state)
+
+        grid.rollback(outer)
+        self.assertEqual(snapshot(), outer_state)
+
+        # once the outermost checkpoint is committed, changes are no longer recorded
+        grid.commit(outer)
+        change(10)
+        self.assertIsNone(grid.trail)
+
+        # committing a checkpoint nested at the same position as the outermost one keeps recording
+        outer = grid.checkpoint()
+        inner = grid.checkpoint()
+        grid.commit(inner)
+        self.assertIsNotNone(grid.trail)
+
+        grid.commit(outer)
+        self.assertIsNone(grid.trail)
+
+    @data(*shapes)
+    @unpack
+    def test_nested_at_start(self, rows, cols):
+        """
+        take checkpoints nested at the very start of the trail (position 0, where the outer and
+        inner checkpoints share a position) and make sure each one is rolled back and committed
+        on its own
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        """
+
+        grid = Grid([0, 0], 0, 0, rows = rows, cols = cols)
+        cells = grid.getAllCellCoordinates()
+
+        # rolling back the inner checkpoint only undoes its own changes, and keeps recording
+        outer = grid.checkpoint()
+        inner = grid.checkpoint()
+        grid.setCell(cells[0], 0)
+        grid.rollback(inner)
+        grid.commit(inner)
+
+        self.assertIsNotNone(grid.trail)
+        grid.setCell(cells[-1], 1)
+
+        grid.rollback(outer)
+        self.assertEqual(len(grid.unoccupied), rows * cols)
+
+        grid.commit(outer)
+        self.assertIsNone(grid.trail)
+        self.assertEqual(grid.checkpoints, [])
+
+        # rolling back the outer checkpoint closes the inner one, so committing the outer one
+        # stops recording
+        outer = grid.checkpoint()
+        inner = grid.checkpoint()
+        grid.setCell(cells[0], 0)
+        grid.rollback(outer)
+        grid.commit(outer)
+
+        self.assertIsNone(grid.trail)
+        self.assertEqual(grid.checkpoints, [])
+        self.assertEqual(len(grid.unoccupied), rows * cols)
+
+        # a checkpoint taken after an inner one was committed is rolled back on its own
+        outer = grid.checkpoint()
+        grid.commit(grid.checkpoint())
+        inner = grid.checkpoint()
+        grid.setCell(cells[0], 0)
+        grid.rollback(inner)
+
+        self.assertTrue(grid.isEmpty(cells[0]))
+        self.assertEqual(grid.checkpoints, [ 0, 0 ])
+
+        grid.commit(outer)
+        self.assertIsNone(grid.trail)
+
+    @data(*shapes)
+    @unpack
+    def test_buckets(self, rows, cols):
+        """
+        randomly occupy, free, roll back and clear cells and make sure the degree buckets always
+        hold exactly the unoccupied cells, each in the bucket of its degree
+
+        @param  rows    :   number of rows in the grid
+        @param  cols    :   number of columns in the grid
+        """
+
+        grid = Grid([0, 0], 0, 0, rows = rows, cols = cols)
+        rng = random.Random(rows * cols + 1)
+
+        def check():
+            bucketed = [ (grid.getCell(index), degree) for degree in range(5) for index in grid.getDegreeBucket(degree) ]
+            expected = [ (cell, countDegree(grid, cell)) for cell in grid.unoccupied ]
+
+            self.assertEqual(sorted(bucketed), sorted(expected))
+
+            if len(expected) > 0:
+                self.assertEqual(grid.getLowestDegree(), min(degree for cell, degree in expected))
+            else:
+                self.assertIsNone(grid.getLowestDegree())
+
+        check()
+
+        start = grid.checkpoint()
+
+        for step in range(200):
+            cell = rng.choice(grid.getAllCellCoordinates())
+
+            if grid.isEmpty(cell):
+                grid.setCell(cell, step)
+            else:
+                grid.resetCell(cell)
+
+            check()
+
+        grid.rollback(start)
+        check()
+
+        for cell in grid.getAllCellCoordinates():
+            grid.setCell(cell, 0)
+        check()
+
+        grid.clearValues()
+        check()
+
+    @data((0, 3), (3, 0), (-1, 0), (0, -1), (3, 3))
+    def test_out_of_bounds(self, cell):
+        """
+        make sure cells outside the grid are refused instead of mapping onto another cell
+
+        @param  cell    :   2-tuple of (column, row) pair outside a 3x3 grid
+        """
+
+        grid = Grid([0, 0], 0, 0, rows = 3, cols = 3)
+
+        self.assertRaises(KeyError, grid.setCell, cell, 5)
+        self.assertRaises(KeyError, grid.resetCell, cell)
+        self.assertRaises(KeyError, grid.degree, cell)
+        self.assertRaises(KeyError, grid.values.__getitem__, cell)
+        self.assertFalse(grid.isEmpty(cell))
+        self.assertFalse(cell in grid.unoccupied)
+
+        self.assertEqual(len(grid.unoccupied), 9)
+        self.assertTrue(all([ value is None for value in grid.values.values() ]))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import os
+import subprocess
+import sys
+import unittest
+
+"""
+make sure the model layer (Grid, Flow and the generator) can be imported and used without pyglet
+"""
+
+# script run in a separate interpreter where importing pyglet fails
+HEADLESS_SCRIPT = """
+import sys
+sys.modules['pyglet'] = None
+
+from context import Grid, Flow, generator
+
+grid = Grid([0, 0], 0, 0, 6, 6)
+paths = generator.generateFlows(grid, seed = 0)
+
+grid.clearValues()
+flows = [ Flow(grid, (0, 0, 0), index, path = path) for index, path in enumerate(paths) ]
+
+assert len(grid.unoccupied) == 0
+"""
+
+class Test_headless(unittest.TestCase):
+    """
+    test that generation never imports pyglet
+    """
+
+    def test_without_pyglet(self):
+        """
+        generate flows and build Flow objects in an interpreter that can't import pyglet
+        """
+
+        result = subprocess.run(    [ sys.executable, "-c", HEADLESS_SCRIPT ],
+                                    cwd = os.path.dirname(os.path.abspath(__file__)),
+                                    stdout = subprocess.PIPE,
+                                    stderr = subprocess.PIPE )
+
+        self.assertEqual(result.returncode, 0, result.stderr.decode())
+
+if __name__ == '__main__':
+    unittest.main()
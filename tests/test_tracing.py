@@ -0,0 +1,70 @@
+from context import Grid, generator
+from budget import Budget
+from tracing import Trace
+import unittest
+import json
+import io
+from ddt import ddt, data, unpack
+
+# (rows, cols, seed, restarts, engine) of the generations to trace
+cases = [   (5, 5, 0, 100, generator.SEARCH_ENGINE), (9, 7, 1, 100, generator.SEARCH_ENGINE),
+            (14, 14, 2, 100, generator.SEARCH_ENGINE), (2, 2, 3, 4, generator.SEARCH_ENGINE),
+            (9, 7, 1, 100, generator.WALK_ENGINE), (14, 14, 2, 100, generator.WALK_ENGINE),
+            (14, 14, 2, 100, generator.BACKBITE_ENGINE), (40, 30, 4, 100, generator.BACKBITE_ENGINE)    ]
+
+@ddt
+class Test_Trace(unittest.TestCase):
+    """
+    test that a Trace's events match the generation it recorded
+    """
+
+    @data(*cases)
+    @unpack
+    def test_events(self, rows, cols, seed, restarts, engine):
+        """
+        trace a generation, then check its events against its counts, its budget and its paths
+
+        @param  rows        :   number of rows in the grid
+        @param  cols        :   number of columns in the grid
+        @param  seed        :   seed for the generation
+        @param  restarts    :   number of times the generation may start over
+        @param  engine      :   engine placing the flows
+        """
+
+        grid, budget, stream = Grid([0, 0], 0, 0, rows, cols), Budget(restarts = restarts), io.StringIO()
+        trace = Trace(stream)
+
+        paths = generator.generateFlows(grid, seed = seed, budget = budget, engine = engine, stats = trace)
+        events = [ json.loads(line) for line in stream.getvalue().splitlines() ]
+
+        kinds = [ event["event"] for event in events ]
+
+        self.assertEqual(kinds[0], "generation")
+        self.assertEqual(kinds[-1], "end")
+        self.assertEqual(events[-1]["finished"], budget.finished)
+
+        self.assertEqual(kinds.count("source"), trace.sourcesTried)
+        self.assertEqual(len([ event for event in events if event["event"] == "place" and event["walk"] ]), trace.walksPlaced)
+        self.assertEqual(len([ event for event in events if event["event"] == "place" and not event["walk"] ]), trace.searchesPlaced)
+        self.assertEqual(kinds.count("fail"), trace.sourcesFailed)
+        self.assertEqual(kinds.count("restart"), budget.restartsUsed)
+        self.assertEqual(kinds.count("reject"), sum(trace.sinksRejected.values()))
+
+        if engine == generator.BACKBITE_ENGINE:
+            # the whole board is one step, and every flow cut from the path is its own source (flows
+            # are only placed once the ones whose ends meet have been merged)
+            self.assertGreaterEqual(kinds.count("source"), kinds.count("place"))
+            self.assertEqual(kinds.count("place") > 0, budget.finished)
+            self.assertEqual(trace.walksPlaced, 0)
+        else:
+            # every source cell tried is one step
+            self.assertEqual(kinds.count("source"), budget.stepsUsed)
+
+        # the flows placed since the last restart are the ones returned
+        last_run = kinds[::-1].index("restart") if "restart" in kinds else len(kinds)
+        placed = [ event["path"] for event in events[len(events) - last_run:] if event["event"] == "place" ]
+
+        self.assertEqual([ [ grid.cells[cell] for cell in path ] for path in placed ], paths)
+
+if __name__ == '__main__':
+    unittest.main()
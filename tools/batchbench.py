@@ -0,0 +1,84 @@
+from context import Grid, generator
+from time import process_time
+import argparse
+import batch
+
+"""
+measure the speedup of the batch engine (batch.generateBatch()) over a loop of generateFlows()
+calls, per board, for each grid size and loop engine; the loop is timed on fewer boards than the
+batch, since its time per board doesn't depend on how many boards it generates, but the batch's
+falls as the batch grows (every round costs about the same whether it walks 100 boards or 10000),
+so speedups are reported for each batch size
+
+the batch only walks flows (like the walk engine), so its boards aren't drawn from the same
+distribution as the search engine's; both loops are timed so the speedup is clear against each
+
+usage: python batchbench.py [size ...] [--boards N ...] [--loop-boards N] [--seed N]
+"""
+
+DEFAULT_SIZES = [ 5, 7, 9 ]         # default sizes of the square grids to generate
+DEFAULT_BOARDS = [ 1000, 10000 ]    # default numbers of boards per batch
+LOOP_BOARDS = 300                   # default number of boards generated by each loop
+
+def timeLoop(size, boards, engine, seed):
+    """
+    time a loop of generateFlows() calls
+
+    @param  size    :   number of rows and columns in the grid
+    @param  boards  :   number of boards to generate
+    @param  engine  :   generation engine to use
+    @param  seed    :   seed of the first board (the rest follow from it)
+
+    @return         :   CPU time per board, in seconds
+    """
+
+    grid = Grid([0, 0], 0, 0, size, size)
+
+    start = process_time()
+    for board in range(boards):
+        grid.clearValues()
+        generator.generateFlows(grid, seed=seed + board, engine=engine)
+
+    return (process_time() - start) / boards
+
+def timeBatch(size, boards, seed):
+    """
+    time one batch
+
+    @param  size    :   number of rows and columns in the grids
+    @param  boards  :   number of boards in the batch
+    @param  seed    :   seed for the batch
+
+    @return         :   2-tuple of the CPU time per board, in seconds, and the fraction of boards filled
+    """
+
+    start = process_time()
+    results = batch.generateBatch(size, size, boards, seed=seed)
+    elapsed = process_time() - start
+
+    return elapsed / boards, float(sum([ not result is None for result in results ])) / boards
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure the batch engine's speedup over a loop of generateFlows() calls")
+    parser.add_argument("sizes", nargs="*", type=int, default=DEFAULT_SIZES, help="sizes of the square grids")
+    parser.add_argument("--boards", nargs="+", type=int, default=DEFAULT_BOARDS, help="numbers of boards per batch")
+    parser.add_argument("--loop-boards", type=int, default=LOOP_BOARDS, help="number of boards generated by each loop")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the batches and the first board of each loop")
+    args = parser.parse_args()
+
+    loop_engines = [ generator.SEARCH_ENGINE, generator.WALK_ENGINE ]
+
+    print("{:>6s}{:>8s}{:>12s}{:>10s}".format("Size", "Boards", "ms/board", "Filled")
+          + "".join([ "{:>14s}".format("vs " + engine) for engine in loop_engines ]))
+
+    for size in args.sizes:
+        loop_times = [ timeLoop(size, args.loop_boards, engine, args.seed) for engine in loop_engines ]
+
+        for engine, loop_time in zip(loop_engines, loop_times):
+            print("{:>6s}{:>8d}{:>12.3f}{:>10s}".format("{}x{}".format(size, size), args.loop_boards, loop_time * 1000, engine))
+
+        for boards in args.boards:
+            batch_time, filled = timeBatch(size, boards, args.seed)
+
+            print("{:>6s}{:>8d}{:>12.3f}{:>10.3f}".format("{}x{}".format(size, size), boards, batch_time * 1000, filled)
+                  + "".join([ "{:>13.1f}x".format(loop_time / batch_time) for loop_time in loop_times ]))
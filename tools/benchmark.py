@@ -0,0 +1,503 @@
+from context import Grid, generator
+from time import perf_counter, process_time, gmtime, strftime
+import tracemalloc
+import platform
+import json
+import sys
+import os
+
+"""
+benchmark flow generation and the functions it spends its time in, and track the results across
+changes as JSON files instead of hand-copied tables; nothing here needs git, so it runs from an
+exported tree or a wheel just the same
+
+micro-benchmarks time getDegreeMinimizedShortestPaths(), getEmptyComponents(), Grid.degree() and
+Grid.setCell()/resetCell() on canned, partly filled boards (the same boards on every run, since
+they're generated from fixed seeds); macro-benchmarks time whole generateFlows() runs per size
+
+memory benchmarks measure, with tracemalloc (Python 3.9+), the peak memory of generateFlows() per
+size and of the functions it allocates the most in (see MemoryTracker), and the net number of
+memory blocks each leaves allocated (net_blocks: the change in sys.getallocatedblocks() over a
+call, so negative if a call frees more blocks than it allocates); they're deterministic, so they
+can be compared across commits just like the times
+
+usage:
+    python benchmark.py run [output file]                   (prints the results if no file is given)
+    python benchmark.py memory [output file]
+    python benchmark.py compare <results file> [baseline file] [threshold]
+
+compare exits with status 1 if any benchmark's median time, peak memory or net allocated blocks grew
+by more than the threshold (a fraction, DEFAULT_THRESHOLD by default) of its baseline value, or its
+success rate fell by more than SUCCESS_TOLERANCE, and with status 2 if the results share no
+benchmark with the baseline; peak memory and net allocated blocks may always grow by up to their
+ABSOLUTE_FLOORS, since small values swing by large fractions (a function that keeps 2 blocks
+instead of 1 grew by 100%); the baseline defaults to BASELINE_FILE for the results of run and
+MEMORY_BASELINE_FILE for those of memory
+
+"""
+
+# sizes of the canned boards used by the micro-benchmarks, the number of times each one is run
+# and the number of calls timed together in each run (single calls are too short to time reliably)
+MICRO_SIZES = [ 8, 16 ]
+MICRO_RUNS = 50
+MICRO_CALLS = 20
+
+# sizes of the grids generated by the macro-benchmarks, and the number of generations per size
+MACRO_SIZES = list(range(4, 16))
+MACRO_RUNS = 30
+
+# percentiles reported for each benchmark's run times
+PERCENTILES = [ 50, 95, 99 ]
+
+# sizes of the grids generated by the memory benchmarks, and the number of generations per size
+MEMORY_SIZES = [ 8, 12, 16, 24 ]
+MEMORY_RUNS = 5
+
+# generator functions whose memory is measured during the memory benchmarks' generations
+TRACKED_FUNCTIONS = [ "getDegreeMinimizedPathTree", "getLegalSinkIndices", "getEmptyComponentSizes", "walkFlow" ]
+
+# largest growth in median time, peak memory or net allocated blocks, as a fraction, and largest drop in
+# success rate that compare doesn't flag as a regression
+DEFAULT_THRESHOLD = 0.2
+SUCCESS_TOLERANCE = 0.1
+
+# metrics compare flags if they grow past the threshold (each benchmark has some of them)
+GROWING_METRICS = [ "p50", "peak", "net_blocks" ]
+
+# growth in peak memory (bytes) and net allocated blocks that compare never flags, however small
+# their baseline values are
+ABSOLUTE_FLOORS = { "peak" : 4096, "net_blocks" : 16 }
+
+# prefix of the names of the memory benchmarks
+MEMORY_PREFIX = "memory/"
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmark", "baseline.json")
+MEMORY_BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "benchmark", "memory_baseline.json")
+
+def getCannedGrid(size, seed):
+    """
+    build a partly filled board: fill a grid with flows from a fixed seed, then remove every
+    other flow
+
+    @param  size    :   number of rows and columns in the grid
+    @param  seed    :   seed for the generation
+
+    @return         :   the partly filled grid
+    """
+
+    grid = Grid([0, 0], 0, 0, size, size)
+    paths = generator.generateFlows(grid, seed=seed)
+
+    for path in paths[::2]:
+        for cell in path:
+            grid.resetCell(cell)
+
+    return grid
+
+def getPercentile(values, percentile):
+    """
+    get a percentile of a list of values by the nearest-rank method
+
+    @param  values      :   sorted, non-empty list of values
+    @param  percentile  :   percentile to get, from 0 to 100
+
+    @return             :   smallest value that is at least as large as the given percentage of the values
+    """
+
+    rank = max(0, -(-percentile * len(values) // 100) - 1)
+
+    return values[int(rank)]
+
+def summarize(wall_times, cpu_times, successes=None):
+    """
+    summarize the runs of a benchmark
+
+    @param      wall_times  :   list of the wall time of each run, in seconds
+    @param      cpu_times   :   list of the CPU time of each run, in seconds
+    @optional   successes   :   list of whether each run succeeded (None if runs can't fail)
+
+    @return                 :   dictionary of the number of runs, the total wall and CPU time, the
+                                percentiles of the wall time of a run and the success rate
+    """
+
+    ordered = sorted(wall_times)
+
+    summary = { "runs" : len(wall_times), "wall" : sum(wall_times), "cpu" : sum(cpu_times) }
+    for percentile in PERCENTILES:
+        summary["p" + str(percentile)] = getPercentile(ordered, percentile)
+
+    summary["success_rate"] = None if successes is None else float(sum(successes)) / len(successes)
+
+    return summary
+
+def measure(function, runs, calls=1):
+    """
+    time a function over several runs
+
+    @param      function    :   function to time, called with no arguments; its return value is
+                                recorded as whether the run succeeded
+    @param      runs        :   number of times to run the function
+    @optional   calls       :   number of times the function is called in each run
+
+    @return                 :   3-tuple of the lists of the wall time, CPU time and last return value of each run
+    """
+
+    wall_times, cpu_times, results = [], [], []
+
+    for run in range(runs):
+        wall_start, cpu_start = perf_counter(), process_time()
+        for call in range(calls):
+            result = function()
+        cpu_times.append(process_time() - cpu_start)
+        wall_times.append(perf_counter() - wall_start)
+
+        results.append(result)
+
+    return wall_times, cpu_times, results
+
+def runMicroBenchmarks():
+    """
+    time the functions flow generation spends its time in on canned boards
+
+    @return     :   dictionary of the summary of each micro-benchmark, by name
+    """
+
+    benchmarks = {}
+
+    for size in MICRO_SIZES:
+        grid = getCannedGrid(size, seed=size)
+        name = "{}x{}".format(size, size)
+
+        source = min(grid.unoccupied)
+        cells = grid.getAllCellCoordinates()
+        empty = sorted(grid.unoccupied)
+
+        def setAndReset():
+            for cell in empty:
+                grid.setCell(cell, True)
+            for cell in empty:
+                grid.resetCell(cell)
+
+        functions = [   ("getDegreeMinimizedShortestPaths", lambda: generator.getDegreeMinimizedShortestPaths(grid, source)),
+                        ("getEmptyComponents", lambda: generator.getEmptyComponents(grid)),
+                        ("Grid.degree", lambda: [ grid.degree(cell) for cell in cells ]),
+                        ("Grid.setCell/resetCell", setAndReset)    ]
+
+        for function_name, function in functions:
+            wall_times, cpu_times, results = measure(function, MICRO_RUNS, calls=MICRO_CALLS)
+            benchmarks["micro/" + function_name + "/" + name] = summarize(wall_times, cpu_times)
+
+    return benchmarks
+
+def runMacroBenchmarks():
+    """
+    time whole flow generations per grid size, each from a fixed seed
+
+    @return     :   dictionary of the summary of each macro-benchmark, by name
+    """
+
+    benchmarks = {}
+
+    for size in MACRO_SIZES:
+        grid = Grid([0, 0], 0, 0, size, size)
+        seeds = iter(range(MACRO_RUNS))
+
+        def generate():
+            grid.clearValues()
+            generator.generateFlows(grid, seed=next(seeds))
+
+            return len(grid.unoccupied) == 0
+
+        wall_times, cpu_times, successes = measure(generate, MACRO_RUNS)
+        benchmarks["macro/generateFlows/{}x{}".format(size, size)] = summarize(wall_times, cpu_times, successes)
+
+    return benchmarks
+
+def runBenchmarks():
+    """
+    run every benchmark
+
+    @return     :   dictionary of the results, with a description of the machine they were measured on
+    """
+
+    benchmarks = runMicroBenchmarks()
+    benchmarks.update(runMacroBenchmarks())
+
+    machine = { "python" : platform.python_version(), "platform" : platform.platform(), "processor" : platform.processor() }
+
+    return { "date" : strftime("%Y-%m-%d %H:%M:%S", gmtime()), "machine" : machine, "benchmarks" : benchmarks }
+
+class MemoryTracker:
+    """
+    class to measure the memory used by calls to functions, with tracemalloc; calls may be nested,
+    and the peak of the whole measurement is kept even though every call resets tracemalloc's peak
+
+    internal attributes:
+    --------------------
+    @attribute  functions   :   dictionary of the calls, highest peak, total peak and total net
+                                number of allocated blocks (see summarize()) of each measured function,
+                                by name
+    @attribute  highest     :   highest traced memory seen by a measured call since the last start()
+    @attribute  open        :   list of the highest traced memory seen so far by each unfinished call
+    """
+
+    def __init__(self):
+        """
+        constructor for the MemoryTracker class
+
+        """
+
+        self.functions = {}
+        self.highest = 0
+        self.open = []
+
+    def start(self):
+        """
+        start measuring the peak of a stretch of code (see getPeak())
+
+        @return :   traced memory at the start
+        """
+
+        tracemalloc.reset_peak()
+        self.highest = 0
+
+        return tracemalloc.get_traced_memory()[0]
+
+    def getPeak(self):
+        """
+        @return :   highest traced memory since start()
+        """
+
+        return max(self.highest, tracemalloc.get_traced_memory()[1])
+
+    def see(self, peak):
+        """
+        pass a peak of traced memory on to the stretch and every unfinished call
+
+        @param  peak    :   traced memory
+        """
+
+        self.highest = max(self.highest, peak)
+        self.open = [ max(highest, peak) for highest in self.open ]
+
+    def wrap(self, name, function):
+        """
+        wrap a function so that its calls are measured
+
+        @param  name        :   name to record the function's calls under
+        @param  function    :   function to measure
+
+        @return             :   wrapped function
+        """
+
+        record = self.functions.setdefault(name, { "calls" : 0, "peak" : 0, "total_peak" : 0, "total_net_blocks" : 0 })
+
+        def measured(*args, **kwargs):
+            net_blocks = sys.getallocatedblocks()
+            current, peak = tracemalloc.get_traced_memory()
+
+            self.see(peak)
+            self.open.append(current)
+            tracemalloc.reset_peak()
+
+            result = function(*args, **kwargs)
+
+            highest = max(self.open.pop(), tracemalloc.get_traced_memory()[1])
+            self.see(highest)
+
+            net_blocks = sys.getallocatedblocks() - net_blocks
+
+            record["calls"] += 1
+            record["peak"] = max(record["peak"], highest - current)
+            record["total_peak"] += highest - current
+            record["total_net_blocks"] += net_blocks
+
+            return result
+
+        return measured
+
+    def summarize(self, name):
+        """
+        summarize the calls of a measured function
+
+        @param  name    :   name the function's calls are recorded under
+
+        @return         :   dictionary of the number of calls, the highest and mean memory a call
+                            used above what was allocated when it started, and the mean net number
+                            of memory blocks a call left allocated (net_blocks, e.g. its return value;
+                            a change in sys.getallocatedblocks(), so negative if a call frees more
+                            blocks than it allocates)
+        """
+
+        record = self.functions[name]
+        calls = max(record["calls"], 1)
+
+        return {    "calls" : record["calls"], "peak" : record["peak"], "mean_peak" : float(record["total_peak"]) / calls,
+                    "net_blocks" : float(record["total_net_blocks"]) / calls    }
+
+def runMemoryBenchmarks():
+    """
+    measure the memory used by generateFlows() per grid size, and by the functions it allocates the
+    most in (TRACKED_FUNCTIONS, replaced in the generator module by measured versions while the
+    benchmarks run), and by getDegreeMinimizedShortestPaths() and getEmptyComponents() on canned boards
+
+    @return     :   dictionary of the results, with a description of the machine they were measured on
+    """
+
+    benchmarks = {}
+    originals = { name : getattr(generator, name) for name in TRACKED_FUNCTIONS }
+
+    tracemalloc.start()
+
+    try:
+        for size in MEMORY_SIZES:
+            tracker = MemoryTracker()
+            for name in TRACKED_FUNCTIONS:
+                setattr(generator, name, tracker.wrap(name, originals[name]))
+
+            grid = Grid([0, 0], 0, 0, size, size)
+            name = "{}x{}".format(size, size)
+
+            peaks, net_blocks = [], []
+            for seed in range(MEMORY_RUNS):
+                grid.clearValues()
+
+                allocated = sys.getallocatedblocks()
+                start = tracker.start()
+
+                paths = generator.generateFlows(grid, seed=seed)
+
+                peaks.append(tracker.getPeak() - start)
+                net_blocks.append(sys.getallocatedblocks() - allocated)
+
+                del paths
+
+            benchmarks[MEMORY_PREFIX + "generateFlows/" + name] = {    "peak" : max(peaks), "mean_peak" : float(sum(peaks)) / len(peaks),
+                                                                    "net_blocks" : float(sum(net_blocks)) / len(net_blocks)    }
+
+            for function_name in TRACKED_FUNCTIONS:
+                benchmarks[MEMORY_PREFIX + function_name + "/" + name] = tracker.summarize(function_name)
+
+            for function_name, function in originals.items():
+                setattr(generator, function_name, function)
+
+        # the public wrappers, which build dictionaries and lists of (col, row) pairs, on canned boards
+        for size in MICRO_SIZES:
+            grid = getCannedGrid(size, seed=size)
+            source = min(grid.unoccupied)
+
+            tracker = MemoryTracker()
+            tracker.wrap("getDegreeMinimizedShortestPaths", generator.getDegreeMinimizedShortestPaths)(grid, source)
+            tracker.wrap("getEmptyComponents", generator.getEmptyComponents)(grid)
+
+            for function_name in tracker.functions:
+                benchmarks[MEMORY_PREFIX + function_name + "/{}x{}".format(size, size)] = tracker.summarize(function_name)
+
+    finally:
+        for function_name, function in originals.items():
+            setattr(generator, function_name, function)
+
+        tracemalloc.stop()
+
+    machine = { "python" : platform.python_version(), "platform" : platform.platform(), "processor" : platform.processor() }
+
+    return { "date" : strftime("%Y-%m-%d %H:%M:%S", gmtime()), "machine" : machine, "benchmarks" : benchmarks }
+
+def compareResults(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    find the benchmarks that got slower, bigger or less successful than a baseline
+
+    @param      results     :   results of runBenchmarks() or runMemoryBenchmarks()
+    @param      baseline    :   results of the same function to compare against
+    @optional   threshold   :   largest growth in median time, peak memory or net allocated blocks, as
+                                a fraction, that isn't a regression (unless it's within the metric's
+                                ABSOLUTE_FLOORS)
+
+    @return                 :   list of 4-tuples of the name, metric, baseline value and new value of
+                                every regression (benchmarks missing from either side are skipped)
+    """
+
+    regressions = []
+
+    for name, summary in sorted(results["benchmarks"].items()):
+        if not name in baseline["benchmarks"]:
+            continue
+
+        old = baseline["benchmarks"][name]
+
+        for metric in GROWING_METRICS:
+            if not metric in summary or not metric in old:
+                continue
+
+            allowed = max(abs(old[metric]) * threshold, ABSOLUTE_FLOORS.get(metric, 0))
+            if summary[metric] > old[metric] + allowed:
+                regressions.append((name, metric, old[metric], summary[metric]))
+
+        if not old.get("success_rate") is None and not summary.get("success_rate") is None:
+            if summary["success_rate"] < old["success_rate"] - SUCCESS_TOLERANCE:
+                regressions.append((name, "success_rate", old["success_rate"], summary["success_rate"]))
+
+    return regressions
+
+def getBaselineFile(results):
+    """
+    @param  results :   results of runBenchmarks() or runMemoryBenchmarks()
+
+    @return         :   name of the baseline file the results are compared against by default
+                        (MEMORY_BASELINE_FILE if they're memory benchmarks, BASELINE_FILE otherwise)
+    """
+
+    names = list(results["benchmarks"])
+
+    if len(names) > 0 and all([ name.startswith(MEMORY_PREFIX) for name in names ]):
+        return MEMORY_BASELINE_FILE
+
+    return BASELINE_FILE
+
+def loadResults(filename):
+    """
+    @param  filename    :   name of a JSON file written by run or memory
+
+    @return             :   the results stored in the file
+    """
+
+    with open(filename) as results_file:
+        return json.load(results_file)
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "run"
+
+    if command == "run" or command == "memory":
+        results = json.dumps(runBenchmarks() if command == "run" else runMemoryBenchmarks(), indent=4, sort_keys=True)
+
+        if len(sys.argv) > 2:
+            with open(sys.argv[2], "w") as results_file:
+                results_file.write(results + "\n")
+        else:
+            print(results)
+
+    elif command == "compare":
+        results = loadResults(sys.argv[2])
+        baseline = loadResults(sys.argv[3] if len(sys.argv) > 3 else getBaselineFile(results))
+        threshold = float(sys.argv[4]) if len(sys.argv) > 4 else DEFAULT_THRESHOLD
+
+        # nothing to compare (e.g. memory results against a baseline of times) isn't a pass
+        if len(set(results["benchmarks"]) & set(baseline["benchmarks"])) == 0:
+            print("The results share no benchmark with the baseline")
+            sys.exit(2)
+
+        regressions = compareResults(results, baseline, threshold)
+
+        print("{:50s}{:15s}{:>12s}{:>12s}".format("Benchmark", "Metric", "Baseline", "Current"))
+        for name, metric, old, new in regressions:
+            print("{:50s}{:15s}{:>12.6f}{:>12.6f}".format(name, metric, old, new))
+
+        print("\n" + str(len(regressions)) + " regression(s) against " + str(len(baseline["benchmarks"])) + " baseline benchmarks")
+
+        sys.exit(1 if len(regressions) > 0 else 0)
+
+    else:
+        print("usage: python benchmark.py run [output file]")
+        print("       python benchmark.py memory [output file]")
+        print("       python benchmark.py compare <results file> [baseline file] [threshold]")
+        sys.exit(2)
@@ -0,0 +1,43 @@
+from time import perf_counter
+
+# time the import of the model layer before anything else is loaded
+start_time = perf_counter()
+from context import Grid, Flow, generator
+import_time = perf_counter() - start_time
+
+import sys
+
+"""
+measure the cold-start time of a headless flow generation worker: importing the model layer,
+building a grid and generating its first set of flows, none of which should load pyglet
+
+The grid size can be provided via the command line (defaults to 10x10)
+"""
+
+DEFAULT_SIZE = 10
+
+try:
+    size = int(sys.argv[1])
+except (ValueError, IndexError):
+    size = DEFAULT_SIZE
+
+# build a grid (graphics-related sizing doesn't matter here)
+start_time = perf_counter()
+grid = Grid([0, 0], 0, 0, size, size)
+grid_time = perf_counter() - start_time
+
+# generate the first set of flows and wrap them in Flow objects, as a worker would
+start_time = perf_counter()
+paths = generator.generateFlows(grid, seed=0)
+generate_time = perf_counter() - start_time
+
+start_time = perf_counter()
+flows = [ Flow(grid, (0, 0, 0), index, path=path) for index, path in enumerate(paths) ]
+flow_time = perf_counter() - start_time
+
+print("{:25s}{:<.4f}s".format("Import", import_time))
+print("{:25s}{:<.4f}s".format("Grid construction", grid_time))
+print("{:25s}{:<.4f}s".format("First generation", generate_time))
+print("{:25s}{:<.4f}s".format("Flow construction", flow_time))
+print("{:25s}{:<.4f}s".format("Total", import_time + grid_time + generate_time + flow_time))
+print("\npyglet imported: " + str("pyglet" in sys.modules))
@@ -1,66 +1,199 @@
-from context import Grid, Flow, generator
+from context import Grid, generator
+from benchmark import getPercentile
 from time import process_time, gmtime
-import git
+from multiprocessing import Pool
+from math import sqrt
+import statistics
+import argparse
+import os
 
 """
-measure the success rates and average runtime of flow generation for various grid sizes
+measure the success rates and runtimes of flow generation for various grid shapes; the trials are
+spread over a pool of worker processes, and trial i of every shape is generated from seed i, so a
+sweep gives the same boards however many workers run it
+
+each trial's CPU time is measured in the worker running it, so busy workers don't inflate each
+other's times; runtimes are reported by their median, percentiles and standard deviation, with a
+95% confidence interval for the mean, and success rates with a 95% Wilson score interval
+
+usage: python performance.py [shape ...] [--trials N] [--workers N] [--engines engine ...]
+shapes are ROWSxCOLS (e.g. 30x20), N for an NxN grid, or A-B for every square size from A to B
 """
 
-MIN_SIZE = 4        # minimum grid size to generate flows for
-MAX_SIZE = 20       # maximum grid size to generate flows for
-NUM_TESTS = 30      # number of flow generations to do per grid size
-
-# include current git master branch commit information to help track performance progress
-current_repo = git.Repo(search_parent_directories=True)
-current_commit = current_repo.heads.master.commit
-
-# figure out date and time via the count of seconds from epoch to the commit
-commit_time = current_commit.authored_date
-time_struct = gmtime(commit_time)
-month, day, year = time_struct.tm_mon, time_struct.tm_mday, time_struct.tm_year
-hour, minute, second = time_struct.tm_hour, time_struct.tm_min, time_struct.tm_sec
-datestring = str(month) + "/" + str(day) + "/" + str(year) + " " + str(hour) + ":" + str(minute) + ":" + str(second)
-
-print("Commit ID: " + current_repo.head.object.hexsha)
-print("Commit branch: " + current_repo.active_branch.name)
-print("\"" + str(current_commit.message.strip()) + "\"")
-print(datestring + "\n")
-
-# make a grid for each measured size (graphics-related sizing doesn't matter here)
-grids = [   Grid(   [0, 0],
-                    0, 0,
-                    size,
-                    size,
-                    (0, 0, 0)   )
-            for size in range(MIN_SIZE, MAX_SIZE + 1)   ]
-
-success_rates, times = [], []
-for i in range(MAX_SIZE - MIN_SIZE + 1):
-    success, runtime = 0, float(0)
-    for j in range(NUM_TESTS):
-        # run the flow generation algorithm and measure its runtime
-        initial_time = process_time()
-        paths = generator.generateFlows(grids[i])
-        runtime += process_time() - initial_time
-
-        # if there are no more empty cells in the grid, generateFlows() succeeded
-        if len(grids[i].unoccupied) == 0:
-            success += 1
-
-        # clear all the marked values in the grid to reset it for the next test
-        grids[i].clearValues()
-
-    success_rates.append(success)
-    times.append(runtime)
-
-print("{:15s}{:18s}{:15s}".format("Grid size", "Success rate", "Average runtime"))
-
-# print out all the collected information
-for i in range(MAX_SIZE - MIN_SIZE + 1):
-    success_rates[i] = float(success_rates[i]) / NUM_TESTS
-    times[i] = times[i] / NUM_TESTS
-
-    size_string = str(i + MIN_SIZE) + "x" + str(i + MIN_SIZE)
-    print("{:<15s}{:<18.3f}{:<15.3f}".format(size_string, success_rates[i], times[i]))
-
-print("\nPerformed " + str(NUM_TESTS) + " tests per size")
+MIN_SIZE = 4        # default minimum grid size to generate flows for
+MAX_SIZE = 20       # default maximum grid size to generate flows for
+NUM_TESTS = 30      # default number of flow generations to do per grid shape
+
+# generation engines to measure
+ENGINES = generator.ENGINES
+
+# percentiles of the runtime to report
+PERCENTILES = [ 90, 99 ]
+
+# standard normal quantile of the 95% confidence intervals
+Z_95 = 1.96
+
+# grid reused by every trial of the same shape run in a worker process (see runTrial())
+worker_grids = {}
+
+def parseShapes(specs):
+    """
+    parse grid shapes from the command line
+
+    @param  specs   :   list of shape strings: ROWSxCOLS, N (NxN) or A-B (every NxN from A to B)
+
+    @return         :   list of (rows, cols) pairs
+    """
+
+    shapes = []
+    for spec in specs:
+        if "x" in spec:
+            rows, cols = spec.split("x")
+            shapes.append((int(rows), int(cols)))
+        elif "-" in spec:
+            first, last = spec.split("-")
+            shapes.extend([ (size, size) for size in range(int(first), int(last) + 1) ])
+        else:
+            shapes.append((int(spec), int(spec)))
+
+    return shapes
+
+def runTrial(task):
+    """
+    run a single flow generation in a worker process
+
+    @param  task    :   4-tuple of the number of rows and columns of the grid, the generation engine
+                        and the seed of the trial
+
+    @return         :   2-tuple of the task and a 2-tuple of the CPU time of the generation and
+                        whether it filled the grid
+    """
+
+    rows, cols, engine, seed = task
+
+    if not (rows, cols) in worker_grids:
+        worker_grids[(rows, cols)] = Grid([0, 0], 0, 0, rows, cols)
+
+    grid = worker_grids[(rows, cols)]
+    grid.clearValues()
+
+    initial_time = process_time()
+    generator.generateFlows(grid, seed=seed, engine=engine)
+    runtime = process_time() - initial_time
+
+    # if there are no more empty cells in the grid, generateFlows() succeeded
+    return task, (runtime, len(grid.unoccupied) == 0)
+
+def getWilsonInterval(successes, trials):
+    """
+    get the 95% Wilson score interval of a success rate, which (unlike the normal approximation)
+    stays within [0, 1] and doesn't collapse to a point when every trial succeeds or fails
+
+    @param  successes   :   number of successful trials
+    @param  trials      :   number of trials
+
+    @return             :   2-tuple of the lower and upper bounds of the interval
+    """
+
+    rate = float(successes) / trials
+    z2 = Z_95 ** 2
+
+    center = (rate + z2 / (2 * trials)) / (1 + z2 / trials)
+    spread = Z_95 * sqrt(rate * (1 - rate) / trials + z2 / (4 * trials ** 2)) / (1 + z2 / trials)
+
+    return max(0.0, center - spread), min(1.0, center + spread)
+
+def summarize(results):
+    """
+    summarize the trials of one engine on one grid shape
+
+    @param  results :   list of (runtime, success) pairs of the trials
+
+    @return         :   dictionary of the success rate and its interval, and the median,
+                        percentiles, standard deviation, mean and mean interval of the runtime
+    """
+
+    runtimes = sorted([ runtime for runtime, success in results ])
+    successes = len([ success for runtime, success in results if success ])
+    trials = len(results)
+
+    mean = statistics.mean(runtimes)
+    deviation = statistics.stdev(runtimes) if trials > 1 else 0.0
+    margin = Z_95 * deviation / sqrt(trials)
+
+    summary = { "success" : float(successes) / trials, "success_interval" : getWilsonInterval(successes, trials),
+                "median" : statistics.median(runtimes), "deviation" : deviation,
+                "mean" : mean, "mean_interval" : (max(0.0, mean - margin), mean + margin) }
+
+    for percentile in PERCENTILES:
+        summary["p" + str(percentile)] = getPercentile(runtimes, percentile)
+
+    return summary
+
+def printCommit():
+    """
+    print the current commit, to help track performance progress (skipped if GitPython isn't
+    installed or the tree isn't a git repository)
+    """
+
+    try:
+        import git
+        current_repo = git.Repo(search_parent_directories=True)
+    except Exception:
+        return
+
+    current_commit = current_repo.head.commit
+
+    # figure out date and time via the count of seconds from epoch to the commit
+    time_struct = gmtime(current_commit.authored_date)
+    month, day, year = time_struct.tm_mon, time_struct.tm_mday, time_struct.tm_year
+    hour, minute, second = time_struct.tm_hour, time_struct.tm_min, time_struct.tm_sec
+    datestring = str(month) + "/" + str(day) + "/" + str(year) + " " + str(hour) + ":" + str(minute) + ":" + str(second)
+
+    print("Commit ID: " + current_commit.hexsha)
+    print("\"" + str(current_commit.message.strip()) + "\"")
+    print(datestring + "\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="measure flow generation success rates and runtimes")
+    parser.add_argument("shapes", nargs="*", default=[ str(MIN_SIZE) + "-" + str(MAX_SIZE) ], help="grid shapes: ROWSxCOLS, N or A-B")
+    parser.add_argument("--trials", type=int, default=NUM_TESTS, help="number of trials per shape and engine")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="number of worker processes")
+    parser.add_argument("--engines", nargs="+", default=ENGINES, choices=ENGINES, help="generation engines to measure")
+    args = parser.parse_args()
+
+    shapes = parseShapes(args.shapes)
+
+    printCommit()
+
+    # run the largest grids first, so no long trial is left running alone at the end of the sweep
+    tasks = [ (rows, cols, engine, seed) for engine in args.engines for rows, cols in shapes for seed in range(args.trials) ]
+    tasks.sort(key=lambda task: -task[0] * task[1])
+
+    results = { (rows, cols, engine) : [] for rows, cols in shapes for engine in args.engines }
+
+    # hand the trials out a few at a time, so small grids don't spend more time passing messages
+    # than generating, while the chunks stay small enough to balance the load
+    chunk_size = max(1, len(tasks) // (8 * args.workers))
+
+    with Pool(args.workers) as pool:
+        for (rows, cols, engine, seed), result in pool.imap_unordered(runTrial, tasks, chunk_size):
+            results[(rows, cols, engine)].append(result)
+
+    # measure each generation engine on the same shapes, so their throughput can be compared
+    for engine in args.engines:
+        print("Engine: " + engine + " (runtimes in seconds of CPU time)")
+        print("{:12s}{:22s}{:11s}{:11s}{:11s}{:11s}{:24s}".format("Grid size", "Success rate (95% CI)", "Median", "p90", "p99", "Std dev", "Mean (95% CI)"))
+
+        for rows, cols in shapes:
+            summary = summarize(results[(rows, cols, engine)])
+
+            size_string = str(rows) + "x" + str(cols)
+            success_string = "{:.3f} [{:.2f}, {:.2f}]".format(summary["success"], *summary["success_interval"])
+            mean_string = "{:.4f} [{:.4f}, {:.4f}]".format(summary["mean"], *summary["mean_interval"])
+
+            print("{:<12s}{:<22s}{:<11.4f}{:<11.4f}{:<11.4f}{:<11.4f}{:<24s}".format(size_string, success_string, summary["median"], summary["p90"], summary["p99"], summary["deviation"], mean_string))
+
+        print("")
+
+    print("Performed " + str(args.trials) + " tests per shape on " + str(args.workers) + " worker processes")
@@ -0,0 +1,183 @@
+from context import Grid, generator
+from budget import Budget
+from tracing import Trace
+import json
+import sys
+
+"""
+summarize a trace of flow generation events (see flow-generator/tracing.py), to find the boards
+that cause expensive retries: generations are summed up per grid size and engine, and the boards
+of the most expensive generations are replayed and drawn as they were whenever a run got stuck
+
+usage:
+    python replay.py <trace file> [number of generations to draw]
+    python replay.py record <trace file> <size> <number of generations> [engine]
+"""
+
+# number of the most expensive generations whose stuck boards are drawn, by default
+DEFAULT_DRAWN = 3
+
+# characters the flows are drawn with, in turn (unoccupied cells are drawn as '.', and the source
+# cells no legal path was found from as 'x')
+FLOW_CHARACTERS = "abcdefghijklmnopqrstuvwyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+def readGenerations(filename):
+    """
+    read a trace, split into its generations
+
+    @param  filename    :   name of the JSONL trace file
+
+    @return             :   list of the list of events of each generation, in order
+    """
+
+    generations = []
+
+    with open(filename) as trace_file:
+        for line in trace_file:
+            if len(line.strip()) == 0:
+                continue
+
+            event = json.loads(line)
+
+            if event["event"] == "generation":
+                generations.append([])
+
+            generations[-1].append(event)
+
+    return generations
+
+def summarize(events):
+    """
+    sum up the events of a generation
+
+    @param  events  :   list of the events of the generation
+
+    @return         :   dictionary of the grid's shape and engine, the number of each kind of event
+                        and the rejected sinks by rule, and the end event's results (or None for them
+                        if the trace ended before the generation did)
+    """
+
+    summary = { "rows" : events[0]["rows"], "cols" : events[0]["cols"], "engine" : events[0]["engine"],
+                "source" : 0, "fail" : 0, "place" : 0, "restart" : 0, "walked" : 0, "rejected" : {},
+                "finished" : None, "seconds" : None }
+
+    for event in events[1:]:
+        kind = event["event"]
+
+        if kind == "reject":
+            summary["rejected"][event["rule"]] = summary["rejected"].get(event["rule"], 0) + 1
+        elif kind == "end":
+            summary["finished"], summary["seconds"] = event["finished"], event["seconds"]
+        else:
+            summary[kind] += 1
+
+            if kind == "place" and event["walk"]:
+                summary["walked"] += 1
+
+    return summary
+
+def getStuckBoards(events):
+    """
+    replay a generation and draw its board every time a run got stuck (right before each restart,
+    and at the end if the grid wasn't filled)
+
+    @param  events  :   list of the events of the generation
+
+    @return         :   list of the drawings of each stuck board, as lists of lines (top row first)
+    """
+
+    rows, cols = events[0]["rows"], events[0]["cols"]
+    board, boards = [ "." ] * (rows * cols), []
+
+    def draw():
+        # cells are numbered col * rows + row, with row 0 at the bottom
+        return [ " ".join([ board[col * rows + row] for col in range(cols) ]) for row in reversed(range(rows)) ]
+
+    for event in events[1:]:
+        kind = event["event"]
+
+        if kind == "place":
+            for cell in event["path"]:
+                board[cell] = FLOW_CHARACTERS[event["flow"] % len(FLOW_CHARACTERS)]
+        elif kind == "fail":
+            board[event["cell"]] = "x"
+        elif kind == "restart":
+            boards.append(draw())
+            board = [ "." ] * (rows * cols)
+        elif kind == "end" and not event["finished"]:
+            boards.append(draw())
+
+    return boards
+
+def record(filename, size, count, engine=generator.SEARCH_ENGINE):
+    """
+    generate flows for several grids of the same size and record them in a trace
+
+    @param      filename    :   name of the JSONL trace file to write
+    @param      size        :   number of rows and columns in the grids
+    @param      count       :   number of grids to generate flows for, from seeds 0, 1, ...
+    @optional   engine      :   engine placing the flows
+    """
+
+    grid = Grid([0, 0], 0, 0, size, size)
+
+    with open(filename, "w") as trace_file:
+        trace = Trace(trace_file)
+
+        for seed in range(count):
+            grid.clearValues()
+            generator.generateFlows(grid, seed=seed, budget=Budget(), engine=engine, stats=trace)
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("usage: python replay.py <trace file> [number of generations to draw]")
+        print("       python replay.py record <trace file> <size> <number of generations> [engine]")
+        sys.exit(2)
+
+    if sys.argv[1] == "record":
+        record(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), *sys.argv[5:6])
+        sys.exit(0)
+
+    generations = readGenerations(sys.argv[1])
+    drawn = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_DRAWN
+
+    summaries = [ summarize(events) for events in generations ]
+
+    # sum up the generations of each grid shape and engine
+    totals = {}
+    for summary in summaries:
+        key = (summary["rows"], summary["cols"], summary["engine"])
+        total = totals.setdefault(key, { "generations" : 0, "finished" : 0, "source" : 0, "fail" : 0, "restart" : 0, "place" : 0, "walked" : 0, "rejected" : {} })
+
+        total["generations"] += 1
+        total["finished"] += int(summary["finished"] == True)
+        for kind in ("source", "fail", "restart", "place", "walked"):
+            total[kind] += summary[kind]
+        for rule, count in summary["rejected"].items():
+            total["rejected"][rule] = total["rejected"].get(rule, 0) + count
+
+    print("{:12s}{:10s}{:8s}{:10s}{:10s}{:10s}{:10s}{:10s}{:s}".format("Grid size", "Engine", "Runs", "Finished", "Sources", "Failed", "Restarts", "Walked", "Rejected sinks (per generation)"))
+    for (rows, cols, engine), total in sorted(totals.items()):
+        runs = total["generations"]
+        rejected = ", ".join([ rule + " " + "{:.1f}".format(float(count) / runs) for rule, count in sorted(total["rejected"].items()) ])
+
+        print("{:<12s}{:<10s}{:<8d}{:<10.3f}{:<10.1f}{:<10.1f}{:<10.2f}{:<10.1f}{:s}".format(    str(rows) + "x" + str(cols), engine, runs, float(total["finished"]) / runs,
+                                                                                            float(total["source"]) / runs, float(total["fail"]) / runs,
+                                                                                            float(total["restart"]) / runs, float(total["walked"]) / runs, rejected    ))
+
+    # draw the stuck boards of the generations that tried the most sources
+    expensive = sorted(range(len(generations)), key=lambda index: -summaries[index]["source"])[:drawn]
+
+    for index in expensive:
+        summary = summaries[index]
+        boards = getStuckBoards(generations[index])
+
+        if len(boards) == 0:
+            continue
+
+        print("\nGeneration #" + str(index) + ": " + str(summary["source"]) + " sources, " + str(summary["restart"]) + " restarts, finished: " + str(summary["finished"]))
+
+        for board in boards:
+            print("")
+            for line in board:
+                print("    " + line)
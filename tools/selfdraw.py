@@ -1,7 +1,6 @@
 from context import Grid, Flow, graphics
 import pyglet
-from random import random, seed
-from datetime import datetime
+from random import random
 from math import floor
 import sys
 
@@ -44,9 +43,6 @@ except IndexError:
     else:
         cols = rows
 
-# seed the random generator
-seed(datetime.now())
-
 # create the window and the grid
 window = pyglet.window.Window(WINDOW_WIDTH, WINDOW_HEIGHT)
 grid = Grid(    GRID_ORIGIN,